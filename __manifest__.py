@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Peepl HR - HR Recruitment',
-    'version': '19.0.1.0.3',
+    'version': '19.0.1.0.4',
     'category': 'HR/Projects',
     'summary': 'HR Recruitment policy for assessment services',
     'description': """
@@ -15,14 +15,21 @@ building on the existing participant management system.
     'author': 'Peepl',
     'website': 'https://peepl.com',
     'license': 'LGPL-3',
-    'depends': ['base', 'hr_recruitment', 'hr_recruitment_reports'],
+    'depends': ['base', 'bus', 'hr_recruitment', 'hr_recruitment_reports'],
     'data': [
         'security/ir.model.access.csv',
         'data/recruitment_test_config_data.xml',
+        'data/ir_cron_data.xml',
         'views/hr_applicant_views.xml',
         'views/recruitment_custom_field_views.xml',
         'views/recruitment_config_views.xml',
+        'views/recruitment_funnel_snapshot_views.xml',
+        'views/recruitment_throughput_report_views.xml',
+        'views/recruitment_perf_stat_views.xml',
+        'views/recruitment_rule_queue_views.xml',
         'views/recruitment_dashboard_views.xml',
+        'wizard/recruitment_applicant_import_views.xml',
+        'wizard/recruitment_rule_simulation_views.xml',
     ],
     'assets': {
         'web.assets_backend': [
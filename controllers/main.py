@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import codecs
+import csv
+import io
+import json
+import tempfile
+
+import xlsxwriter
+from werkzeug.exceptions import BadRequest
+
+from odoo import api, http
+from odoo.http import content_disposition, request
+
+# bytes read at once when sending a generated xlsx file
+XLSX_READ_SIZE = 1 << 16
+# rows of an xlsx worksheet, header included
+XLSX_MAX_ROWS = 1048576
+
+
+def _export_chunks(registry, uid, context, domain, fnames):
+    """Yield the exported rows on a cursor of their own: the response is
+    sent after the request cursor is closed"""
+    with registry.cursor() as cr:
+        env = api.Environment(cr, uid, context)
+        yield from env['hr.applicant']._iter_export_rows(domain, fnames)
+
+
+def _csv_stream(labels, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(labels)
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+
+
+def _xlsx_stream(labels, chunks):
+    # xlsx is a zip archive, only complete once every row is written;
+    # constant_memory keeps the rows on disk until then
+    with tempfile.TemporaryFile() as file:
+        workbook = xlsxwriter.Workbook(file, {'constant_memory': True})
+        header = workbook.add_format({'bold': True})
+        sheet, row_index = None, XLSX_MAX_ROWS
+        for rows in chunks:
+            for row in rows:
+                if row_index >= XLSX_MAX_ROWS:
+                    sheet = workbook.add_worksheet()
+                    sheet.write_row(0, 0, labels, header)
+                    row_index = 1
+                sheet.write_row(row_index, 0, row)
+                row_index += 1
+        if sheet is None:
+            workbook.add_worksheet().write_row(0, 0, labels, header)
+        workbook.close()
+        file.seek(0)
+        while data := file.read(XLSX_READ_SIZE):
+            yield data
+
+
+class RecruitmentConfigController(http.Controller):
+
+    @http.route('/peepl_hr_custom/config', type='jsonrpc', auth='user', readonly=True)
+    def recruitment_config(self):
+        """Return the status, phase and test configurations in one call"""
+        return {
+            'statuses': request.env['recruitment.status.config']._get_client_data(),
+            'phases': request.env['recruitment.phase.config']._get_client_data(),
+            'tests': request.env['recruitment.test.config']._get_client_data(),
+        }
+
+
+class RecruitmentExportController(http.Controller):
+
+    @http.route('/peepl_hr_custom/applicants/export', type='http', auth='user', methods=['GET'], readonly=True)
+    def export_applicants(self, file_format='csv', domain='[]'):
+        """Stream the applicants matching ``domain`` (JSON) with their custom
+        field values as a CSV or XLSX file"""
+        if file_format not in ('csv', 'xlsx'):
+            raise BadRequest("Unsupported export format")
+        Applicant = request.env['hr.applicant']
+        try:
+            domain = json.loads(domain)
+            if not isinstance(domain, list):
+                raise ValueError("The domain must be a list")
+            # reject invalid domains before the response starts
+            Applicant._search(domain)
+        except Exception as e:
+            raise BadRequest(str(e))
+
+        columns = Applicant._get_export_columns()
+        labels = [label for __, label in columns]
+        chunks = _export_chunks(
+            request.env.registry, request.env.uid, dict(request.env.context),
+            domain, [fname for fname, __ in columns],
+        )
+        if file_format == 'csv':
+            body = _csv_stream(labels, chunks)
+            content_type = 'text/csv;charset=utf-8'
+        else:
+            body = _xlsx_stream(labels, chunks)
+            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        response = request.make_response(body, [
+            ('Content-Type', content_type),
+            ('Content-Disposition', content_disposition(f'applicants.{file_format}')),
+        ])
+        response.direct_passthrough = True
+        return response
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    # dropdown templates created before the ordinal columns existed
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['recruitment.custom.field']._init_ordinal_columns()
@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from . import hr_applicant
+from . import ir_cron
+from . import ir_http
+from . import ir_websocket
 from . import recruitment_config
-from . import recruitment_custom_field
\ No newline at end of file
+from . import recruitment_custom_field
+from . import recruitment_funnel_snapshot
+from . import recruitment_perf_stat
+from . import recruitment_rule_queue
+from . import recruitment_stage_history
+from . import recruitment_throughput_report
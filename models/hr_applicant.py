@@ -1,5 +1,37 @@
+import logging
+import time
+from collections import Counter, defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
+from odoo.tools import html2plaintext
+from .recruitment_funnel_snapshot import FUNNEL_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+# applicants created per create() call by the bulk import
+IMPORT_CHUNK_SIZE = 1000
+# applicants read per query by the streaming export
+EXPORT_CHUNK_SIZE = 2000
+# bus channel of the dashboard, one per company and one shared by all of them
+DASHBOARD_CHANNEL = 'peepl_hr_custom_dashboard'
+# notification type of the dashboard count deltas
+DASHBOARD_DELTA = 'peepl_hr_custom/dashboard_delta'
+# notification type telling the dashboards to refetch their counts
+DASHBOARD_RELOAD = 'peepl_hr_custom/dashboard_reload'
+# exported before the custom fields
+EXPORT_FIELDS = ['partner_name', 'email_from', 'job_id', 'stage_id', 'recruitment_phase',
+                 'hire_decision', 'last_test', 'applicant_notes', 'create_date']
+
+
+def _dashboard_channel(env, company_id):
+    """Return the bus channel of the dashboard deltas of ``company_id``;
+    applicants without company are counted by every company, their deltas
+    go to a single channel shared by all recruitment users"""
+    if company_id:
+        return (env['res.company'].browse(company_id), DASHBOARD_CHANNEL)
+    return (env.ref('hr_recruitment.group_hr_recruitment_user'), DASHBOARD_CHANNEL)
+
 
 class HrApplicant(models.Model):
     _inherit = 'hr.applicant'
@@ -19,10 +51,270 @@ class HrApplicant(models.Model):
         ('do_not_pursue', 'Do Not Pursue')
     ], 'Decision')
     contract_type_id = fields.Many2one('hr.contract.type', 'Contract Type')
-    
+
+    @api.model
+    def get_dashboard_data(self, domain=None):
+        """Return the recruitment dashboard KPIs, chart breakdowns and months
+
+        Without a domain, counts come from recruitment.funnel.snapshot
+        instead of scanning the applicants.
+        """
+        if not domain and self.env.user.has_group('hr_recruitment.group_hr_recruitment_user'):
+            Model = self.env['recruitment.funnel.snapshot']
+            domain = [('company_id', 'in', self.env.companies.ids + [False]), ('applicant_count', '!=', 0)]
+            aggregate, month_field = 'applicant_count:sum', 'month'
+        else:
+            Model, domain = self, domain or []
+            aggregate, month_field = '__count', 'last_test'
+
+        decisions = dict(Model._read_group(domain, ['hire_decision'], [aggregate]))
+        stages = Model._read_group(domain, ['stage_id'], [aggregate])
+        months = Model._read_group(domain + [(month_field, '!=', False)], [f'{month_field}:month'], [aggregate])
+
+        total = sum(decisions.values())
+        failed = decisions.get('do_not_pursue', 0)
+        selection = self._fields['hire_decision']._description_selection(self.env)
+        return {
+            'stats': {
+                'total': total,
+                'assessed': sum(count for __, count in months),
+                'onProgress': total - failed,
+                'failed': failed,
+            },
+            'phaseData': [
+                {'id': stage.id, 'name': stage.display_name, 'count': count}
+                for stage, count in stages if stage and count
+            ],
+            'statusData': [
+                {'code': code, 'name': name, 'count': decisions[code]}
+                for code, name in selection if decisions.get(code)
+            ],
+            'months': sorted((month.strftime('%Y-%m') for month, count in months if count), reverse=True),
+        }
+
+    def _send_dashboard_delta(self, *deltas):
+        """Publish the net dashboard counts changed by snapshot ``deltas``
+        (rows of recruitment.funnel.snapshot._apply_delta) on the bus
+
+        Messages are sent with the transaction, so rolled back changes are
+        never published.
+        """
+        counts = Counter()
+        for rows in deltas:
+            for company_id, stage_id, decision, month, count in rows:
+                counts[company_id, stage_id, decision, month] += count
+        by_company = defaultdict(list)
+        stage_ids = {stage_id for (__, stage_id, __, __), count in counts.items() if stage_id and count}
+        stage_names = {stage.id: stage.display_name for stage in self.env['hr.recruitment.stage'].sudo().browse(stage_ids)}
+        for (company_id, stage_id, decision, month), count in counts.items():
+            if count:
+                by_company[company_id].append({
+                    'stage_id': stage_id,
+                    'stage_name': stage_names.get(stage_id),
+                    'hire_decision': decision,
+                    'month': month and month.strftime('%Y-%m'),
+                    'count': count,
+                })
+        if not by_company:
+            return
+        Bus = self.env['bus.bus'].sudo()
+        for company_id, company_deltas in by_company.items():
+            message = {'company_id': company_id, 'deltas': company_deltas}
+            Bus._sendone(_dashboard_channel(self.env, company_id), DASHBOARD_DELTA, message)
+
+    @api.model
+    def _send_dashboard_reload(self):
+        """Tell every open dashboard to refetch its counts, after changes
+        made in SQL that yield no deltas (e.g. a snapshot rebuild)"""
+        Bus = self.env['bus.bus'].sudo()
+        for company in self.env['res.company'].sudo().search([]):
+            Bus._sendone(_dashboard_channel(self.env, company.id), DASHBOARD_RELOAD, {'company_id': company.id})
+        Bus._sendone(_dashboard_channel(self.env, False), DASHBOARD_RELOAD, {'company_id': False})
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # the decisions set by the rules during the create are counted below
+        applicants = super(HrApplicant, self.with_context(funnel_snapshot_tracked=True)).create(vals_list)
+        applicants = applicants.with_env(self.env)
+        applicants._send_dashboard_delta(self.env['recruitment.funnel.snapshot']._apply_delta(applicants, 1))
+        self.env['recruitment.stage.history']._record(applicants)
+        return applicants
+
     def write(self, vals):
         if 'stage_id' in vals and not self.env.context.get('import_file'):
-            for rec in self:
-                if rec.hire_decision == 'do_not_pursue':
-                    raise UserError('Cannot change stage for applicants with "Do Not Pursue" status.')
-        return super().write(vals)
\ No newline at end of file
+            # hire_decision of the whole batch is fetched in one query
+            if 'do_not_pursue' in self.mapped('hire_decision'):
+                raise UserError('Cannot change stage for applicants with "Do Not Pursue" status.')
+        if self.env.context.get('funnel_snapshot_tracked') or not any(fname in vals for fname in FUNNEL_FIELDS):
+            # nothing to count, or counted by the create or write this one is
+            # nested in, e.g. the decisions set by the rules
+            res = super().write(vals)
+        else:
+            Snapshot = self.env['recruitment.funnel.snapshot']
+            removed = Snapshot._apply_delta(self, -1)
+            res = super(HrApplicant, self.with_context(funnel_snapshot_tracked=True)).write(vals)
+            self._send_dashboard_delta(removed, Snapshot._apply_delta(self, 1))
+        if 'stage_id' in vals or 'recruitment_phase' in vals:
+            self.env['recruitment.stage.history']._record(self)
+        return res
+
+    def unlink(self):
+        self._send_dashboard_delta(self.env['recruitment.funnel.snapshot']._apply_delta(self, -1))
+        return super().unlink()
+
+    # ------------------------------------------------------------
+    # Bulk import
+    # ------------------------------------------------------------
+
+    @api.model
+    def _get_import_columns(self, headers):
+        """Map file headers to field names: technical names, field labels
+        and custom field names are accepted"""
+        by_label = {field.string.strip().lower(): fname for fname, field in self._fields.items() if field.store}
+        for template in self.env['recruitment.custom.field']._get_template_layout():
+            by_label[template.name.strip().lower()] = template.column
+        columns = []
+        for header in headers:
+            header = (header or '').strip()
+            fname = header if header in self._fields else by_label.get(header.lower())
+            if not fname or fname not in self._fields:
+                raise UserError(f'Unknown column "{header}" in the import file.')
+            columns.append(fname)
+        return columns
+
+    def _convert_import_value(self, field, value, records_cache):
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            return False
+        if field.type == 'boolean':
+            return str(value).lower() in ('1', 'true', 'yes', 'y', 'x')
+        if field.type == 'integer':
+            return int(float(value))
+        if field.type == 'float':
+            return float(value)
+        if field.type == 'date':
+            return fields.Date.to_date(value)
+        if field.type == 'datetime':
+            return fields.Datetime.to_datetime(value)
+        if field.type == 'many2one':
+            key = (field.comodel_name, str(value))
+            if key not in records_cache:
+                records_cache[key] = self.env[field.comodel_name].search([('display_name', '=ilike', str(value))], limit=1).id
+            if not records_cache[key]:
+                raise ValueError(f'{field.string}: no {field.comodel_name} named "{value}"')
+            return records_cache[key]
+        return str(value)
+
+    @api.model
+    def _import_applicants(self, rows, chunk_size=IMPORT_CHUNK_SIZE):
+        """Create applicants from ``rows`` (an iterable of value lists whose
+        first item is the header) by batches of ``chunk_size``
+
+        Each batch is created with one ``create`` call, so auto-decision
+        rules run once per batch. A failing batch is retried row by row to
+        report the offending rows.
+
+        :return: dict with the number of ``created`` applicants, the
+                 ``errors`` as (row number, message) and the ``duration``
+        """
+        started = time.monotonic()
+        Applicant = self.with_context(tracking_disable=True, mail_create_nolog=True, import_file=True)
+        rows = iter(rows)
+        columns = self._get_import_columns(next(rows, []))
+        records_cache = {}
+        created, errors = 0, []
+
+        def create_chunk(chunk):
+            try:
+                with self.env.cr.savepoint():
+                    Applicant.create([vals for __, vals in chunk])
+                return len(chunk)
+            except Exception:
+                pass
+            count = 0
+            for row_number, vals in chunk:
+                try:
+                    with self.env.cr.savepoint():
+                        Applicant.create([vals])
+                    count += 1
+                except Exception as e:
+                    errors.append((row_number, str(e)))
+            return count
+
+        chunk = []
+        for row_number, row in enumerate(rows, start=2):
+            if not any(value not in (None, '') for value in row):
+                continue
+            try:
+                vals = {
+                    fname: self._convert_import_value(self._fields[fname], value, records_cache)
+                    for fname, value in zip(columns, row)
+                }
+            except Exception as e:
+                errors.append((row_number, str(e)))
+                continue
+            chunk.append((row_number, vals))
+            if len(chunk) >= chunk_size:
+                created += create_chunk(chunk)
+                chunk = []
+                _logger.info("Imported %s applicants (%.0f rows/s)", created, created / (time.monotonic() - started))
+        if chunk:
+            created += create_chunk(chunk)
+
+        return {'created': created, 'errors': errors, 'duration': time.monotonic() - started}
+
+    # ------------------------------------------------------------
+    # Streaming export
+    # ------------------------------------------------------------
+
+    @api.model
+    def _get_export_columns(self):
+        """Return the exported (field name, label) pairs, custom fields included"""
+        fnames = [fname for fname in EXPORT_FIELDS if fname in self._fields] + self._get_template_fnames()
+        labels = self.fields_get(fnames, ['string'])
+        return [(fname, labels[fname]['string']) for fname in fnames]
+
+    def _get_export_formatter(self, field):
+        """Return a function giving the exported value of ``field`` for a
+        record; names of statuses and selections are resolved once here"""
+        fname = field.name
+        if fname == 'hire_decision':
+            names = dict(field._description_selection(self.env))
+            statuses = self.env['recruitment.status.config'].get_by_codes(names)
+            names.update((code, status.name) for code, status in statuses.items())
+            return lambda record: names.get(record[fname], record[fname] or '')
+        if field.type == 'selection':
+            names = dict(field._description_selection(self.env))
+            return lambda record: names.get(record[fname], record[fname] or '')
+        if field.type == 'many2one':
+            return lambda record: record[fname].display_name or ''
+        if field.type == 'date':
+            return lambda record: fields.Date.to_string(record[fname]) or ''
+        if field.type == 'datetime':
+            return lambda record: fields.Datetime.to_string(record[fname]) or ''
+        if field.type == 'html':
+            return lambda record: html2plaintext(record[fname]) if record[fname] else ''
+        if field.type in ('integer', 'float', 'boolean'):
+            return lambda record: record[fname]
+        return lambda record: record[fname] or ''
+
+    @api.model
+    def _iter_export_rows(self, domain, fnames, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield the rows of the applicants matching ``domain``, as lists of
+        ``chunk_size`` rows of exported values
+
+        The applicants are walked by increasing id, one query per chunk, and
+        the cache is emptied between chunks so memory does not grow with
+        the number of rows.
+        """
+        formatters = [self._get_export_formatter(self._fields[fname]) for fname in fnames]
+        stored = [fname for fname in fnames if self._fields[fname].store]
+        last_id = 0
+        while True:
+            records = self.search_fetch(domain + [('id', '>', last_id)], stored, order='id', limit=chunk_size)
+            if not records:
+                return
+            yield [[formatter(record) for formatter in formatters] for record in records]
+            last_id = records[-1].id
+            self.env.invalidate_all()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class IrCron(models.Model):
+    _inherit = 'ir.cron'
+
+    def _callback(self, cron_name, server_action_id):
+        # cron workers do not go through ir.http: serve every job, like the
+        # mail gateway creating applicants, the latest custom fields
+        self.env['recruitment.custom.field'].sudo()._check_template_version()
+        return super()._callback(cron_name, server_action_id)
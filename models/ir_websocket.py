@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .hr_applicant import DASHBOARD_CHANNEL, _dashboard_channel
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        # the dashboard subscribes by name; recruitment users receive the
+        # deltas of their companies and, once, those without company
+        channels = list(channels)
+        if DASHBOARD_CHANNEL in channels:
+            channels.remove(DASHBOARD_CHANNEL)
+            if self.env.user.has_group('hr_recruitment.group_hr_recruitment_user'):
+                channels.extend(_dashboard_channel(self.env, company.id) for company in self.env.user.company_ids)
+                channels.append(_dashboard_channel(self.env, False))
+        return super()._build_bus_channel_list(channels)
@@ -1,9 +1,71 @@
 # -*- coding: utf-8 -*-
+from collections import namedtuple
+
+from odoo import api, models, fields
+from odoo.tools import ormcache
+
+ConfigEntry = namedtuple('ConfigEntry', ['id', 'code', 'name', 'sequence', 'active'])
+
+
+class RecruitmentConfigMixin(models.AbstractModel):
+    """Code and id lookups of the recruitment reference tables, cached per
+    process and invalidated with the registry cache"""
+    _name = 'recruitment.config.mixin'
+    _description = 'Recruitment Configuration Lookup'
+
+    @ormcache()
+    def _get_entries(self):
+        """Return ``(by_code, by_id)`` mappings to the ConfigEntry of every
+        record, archived ones included. They are shared by the whole process
+        and must not be modified."""
+        records = self.sudo().with_context(active_test=False).search_fetch([], ['code', 'name', 'sequence', 'active'])
+        entries = [ConfigEntry(record.id, record.code, record.name, record.sequence, record.active) for record in records]
+        by_code = {}
+        # on duplicate codes, active records win, then the record order
+        for entry in sorted(entries, key=lambda entry: not entry.active):
+            by_code.setdefault(entry.code, entry)
+        return by_code, {entry.id: entry for entry in entries}
+
+    @api.model
+    def get_by_codes(self, codes):
+        """Return ``{code: ConfigEntry}`` for the known ``codes``"""
+        by_code = self._get_entries()[0]
+        return {code: by_code[code] for code in codes if code in by_code}
+
+    @api.model
+    def get_by_ids(self, ids):
+        """Return ``{id: ConfigEntry}`` for the existing ``ids``"""
+        by_id = self._get_entries()[1]
+        return {id_: by_id[id_] for id_ in ids if id_ in by_id}
+
+    @api.model
+    def _get_client_data(self):
+        """Return the entries as dicts, in record order, for the web client"""
+        self.check_access('read')
+        return [entry._asdict() for entry in self._get_entries()[1].values()]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if vals.keys() & {'code', 'name', 'sequence', 'active'}:
+            # compiled auto-decision rules embed the status codes
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
 
-from odoo import models, fields
 
 class RecruitmentTestConfig(models.Model):
     _name = 'recruitment.test.config'
+    _inherit = ['recruitment.config.mixin']
     _description = 'Test Configuration'
     _order = 'sequence, name'
 
@@ -14,6 +76,7 @@ class RecruitmentTestConfig(models.Model):
 
 class RecruitmentPhaseConfig(models.Model):
     _name = 'recruitment.phase.config'
+    _inherit = ['recruitment.config.mixin']
     _description = 'Recruitment Phase Configuration'
     _order = 'sequence, name'
 
@@ -24,10 +87,11 @@ class RecruitmentPhaseConfig(models.Model):
 
 class RecruitmentStatusConfig(models.Model):
     _name = 'recruitment.status.config'
+    _inherit = ['recruitment.config.mixin']
     _description = 'Recruitment Status Configuration'
     _order = 'sequence, name'
 
     name = fields.Char('Status Name', required=True)
     code = fields.Char('Code', required=True)
     sequence = fields.Integer('Sequence', default=10)
-    active = fields.Boolean('Active', default=True)
\ No newline at end of file
+    active = fields.Boolean('Active', default=True)
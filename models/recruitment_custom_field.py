@@ -1,8 +1,347 @@
 # -*- coding: utf-8 -*-
+import ast
+import functools
+import json
+import logging
 import operator
+import re
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 from lxml.builder import E
 from odoo import api, fields, models, _
-from odoo.tools import make_index_name, create_index
+from odoo.exceptions import UserError
+from odoo.tools import SQL, make_index_name, create_index, ormcache
+
+from .recruitment_perf_stat import profiled
+from .recruitment_rule_queue import DEFERRED_RULES_PARAM
+
+_logger = logging.getLogger(__name__)
+
+
+FIELD_TYPES = [
+    ('char', 'Text'),
+    ('text', 'Multiline Text'),
+    ('integer', 'Integer'),
+    ('float', 'Decimal'),
+    ('boolean', 'Checkbox'),
+    ('date', 'Date'),
+    ('datetime', 'DateTime'),
+    ('selection', 'Dropdown'),
+    ('many2one', 'Many2one'),
+]
+NUMERIC_TYPES = ('integer', 'float')
+STRING_TYPES = ('char', 'text', 'selection')
+ORDER_OPERATORS = ('>', '>=', '<', '<=')
+COMPARE_OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+SQL_OPERATORS = {
+    '=': SQL('='),
+    '!=': SQL('<>'),
+    '>': SQL('>'),
+    '>=': SQL('>='),
+    '<': SQL('<'),
+    '<=': SQL('<='),
+}
+# rows updated per statement when re-applying rules in SQL
+RULE_SQL_CHUNK_SIZE = 50000
+# bumped whenever the set of templates shown in views changes
+TEMPLATE_VERSION_PARAM = 'peepl_hr_custom.template_version'
+# template fields affecting the generated column or its place in views
+LAYOUT_FIELDS = ['name', 'field_type', 'selection_values', 'relation_model', 'active', 'anchor_field', 'position', 'sequence']
+# template fields read by the cached rules, layouts and dropdown positions
+CACHED_FIELDS = LAYOUT_FIELDS + ['storage', 'validation_active', 'validation_operator', 'validation_value',
+                                 'target_decision', 'default_decision']
+
+# rows backfilled per transaction when migrating a column to another type
+MIGRATION_BATCH_SIZE = 5000
+# a migration step gives up instead of queueing behind long transactions
+MIGRATION_LOCK_TIMEOUT = '5s'
+COLUMN_TYPES = {
+    'char': 'varchar',
+    'text': 'text',
+    'integer': 'int4',
+    'float': 'float8',
+    'boolean': 'bool',
+    'date': 'date',
+    'datetime': 'timestamp',
+    'selection': 'varchar',
+    'many2one': 'int4',
+}
+INTEGER_PATTERN = r'^\s*[-+]?\d{1,9}\s*$'
+NUMBER_PATTERN = r'^\s*[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d{1,3})?\s*$'
+TRUE_STRINGS = ['1', 't', 'true', 'y', 'yes']
+FALSE_STRINGS = ['0', 'f', 'false', 'n', 'no']
+# plpgsql cast returning NULL instead of raising on malformed input
+TRY_CAST_FUNCTION = 'peepl_hr_custom_try_cast'
+
+# cursor precommit data holding template ids whose column sync is deferred
+PENDING_SYNC_KEY = 'peepl_hr_custom.pending_field_sync'
+# cursor postcommit data marking a transaction that changed template fields
+SCHEMA_CHANGE_KEY = 'peepl_hr_custom.template_schema_change'
+
+# where the values of a template are kept
+STORAGE_MODES = [
+    ('column', 'Table Column'),
+    ('json', 'JSON'),
+]
+# hr.applicant jsonb column holding the values of the json templates, keyed
+# by the name of their field
+JSON_VALUES_FIELD = 'custom_values'
+CUSTOM_FIELD_PATTERN = re.compile(r'x_field\d+_value')
+# hr.applicant integer column holding the position of the value of a dropdown
+# template among its options, from 1, 0 when not an option
+ORDINAL_FIELD_PATTERN = re.compile(r'(x_field\d+)_ord')
+JSON_TEXT_OPERATORS = {
+    'like': SQL('LIKE'),
+    'ilike': SQL('ILIKE'),
+    'not like': SQL('NOT LIKE'),
+    'not ilike': SQL('NOT ILIKE'),
+    '=like': SQL('LIKE'),
+    '=ilike': SQL('ILIKE'),
+}
+
+# per database, the registry and the template version its hr.applicant
+# fields were loaded for
+_loaded_template_versions = {}
+
+TemplateLayout = namedtuple('TemplateLayout', ['id', 'column', 'name', 'field_type', 'anchor_field', 'position'])
+
+
+class CompiledRule:
+    """Pre-parsed auto-decision rule of a recruitment.custom.field template.
+
+    Thresholds and selection order are resolved once so evaluating a value
+    is a plain comparison. ``kind`` is one of:
+
+    - ``none``: no usable rule, truthy values get the default decision
+    - ``const``: the comparison result does not depend on the value
+    - ``numeric``: values are compared as floats
+    - ``text``: values are compared as-is
+    - ``ordinal``: values are compared by their position in the selection
+    """
+    __slots__ = ('template_id', 'column', 'field_type', 'kind', 'operator',
+                 'operand', 'options', 'target', 'default')
+
+    def __init__(self, template_id, column, field_type, kind, operator=None,
+                 operand=None, options=None, target=False, default=False):
+        self.template_id = template_id
+        self.column = column
+        self.field_type = field_type
+        self.kind = kind
+        self.operator = operator
+        self.operand = operand
+        self.options = options or {}
+        self.target = target
+        self.default = default
+
+    @classmethod
+    def from_template(cls, template, draft=None):
+        """Build the rule of ``template``, mirroring the per-record checks
+
+        :param draft: unsaved values of the validation fields, overriding
+            the ones of ``template``
+        """
+        draft = draft or {}
+        op = draft.get('validation_operator', template.validation_operator)
+        rule_val = draft.get('validation_value', template.validation_value)
+        target_decision = draft.get('target_decision', template.target_decision)
+        default_decision = draft.get('default_decision', template.default_decision)
+        statuses = template.env['recruitment.status.config'].get_by_ids([
+            target_decision.id, default_decision.id,
+        ])
+        target = statuses.get(target_decision.id)
+        default = statuses.get(default_decision.id)
+        base = dict(
+            template_id=template.id,
+            column=template._column_name(),
+            field_type=template.field_type,
+            target=target and target.code or False,
+            default=default and default.code or False,
+        )
+        if not op or not target_decision:
+            return cls(kind='none', **base)
+        try:
+            return cls(operator=op, **base, **cls._parse(template, op, rule_val))
+        except Exception:
+            # unparsable thresholds never match: only the default applies
+            return cls(kind='const', operator=op, operand=False, **base)
+
+    @staticmethod
+    def _parse(template, op, rule_val):
+        field_type = template.field_type
+        options = [v.strip() for v in (template.selection_values or '').split('\n') if v.strip()]
+        positions = {}
+        for index, option in enumerate(options):
+            positions.setdefault(option, index)
+
+        if field_type in NUMERIC_TYPES:
+            if op in ('in', 'not in'):
+                return {'kind': 'numeric', 'operand': frozenset(float(v.strip()) for v in rule_val.split(','))}
+            if op == 'between':
+                min_val, max_val = [v.strip() for v in rule_val.split(',')]
+                return {'kind': 'numeric', 'operand': (float(min_val), float(max_val))}
+            return {'kind': 'numeric', 'operand': float(rule_val)}
+
+        if op in ('in', 'not in'):
+            values = tuple(v.strip() for v in rule_val.split(','))
+            if field_type not in STRING_TYPES:
+                # dates, booleans and records never equal a string
+                return {'kind': 'const', 'operand': op == 'not in'}
+            return {'kind': 'text', 'operand': values}
+
+        if op == 'between':
+            min_val, max_val = [v.strip() for v in rule_val.split(',')]
+            if not options or field_type not in STRING_TYPES:
+                return {'kind': 'const', 'operand': False}
+            return {'kind': 'ordinal', 'operand': (options.index(min_val), options.index(max_val)), 'options': positions}
+
+        if field_type == 'selection' and op in ORDER_OPERATORS:
+            if not options:
+                return {'kind': 'const', 'operand': False}
+            return {'kind': 'ordinal', 'operand': options.index(rule_val), 'options': positions}
+
+        if field_type == 'boolean' and rule_val is False:
+            # a truthy checkbox compares as True against the empty threshold
+            return {'kind': 'const', 'operand': COMPARE_OPERATORS[op](True, False)}
+        if field_type not in STRING_TYPES or not isinstance(rule_val, str):
+            # equality with a foreign type is always False, ordering raises
+            return {'kind': 'const', 'operand': op == '!='}
+        return {'kind': 'text', 'operand': rule_val}
+
+    def matches(self, value):
+        """Return whether a truthy ``value`` satisfies the rule"""
+        kind, op, operand = self.kind, self.operator, self.operand
+        if kind == 'const':
+            return operand
+        if kind == 'ordinal':
+            value = self.options.get(value)
+            if value is None:
+                return False
+        elif kind == 'numeric':
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False
+        if op == 'in':
+            return value in operand
+        if op == 'not in':
+            return value not in operand
+        if op == 'between':
+            return operand[0] <= value <= operand[1]
+        try:
+            return COMPARE_OPERATORS[op](value, operand)
+        except TypeError:
+            return False
+
+    def decide(self, value):
+        """Return the decision code for ``value``, or False to keep the current one"""
+        if not value or self.kind == 'none':
+            return self.default
+        return self.target if self.matches(value) else self.default
+
+    def _sql_falsy(self, column):
+        if self.field_type in NUMERIC_TYPES:
+            return SQL("(%s IS NULL OR %s = 0)", column, column)
+        if self.field_type in STRING_TYPES:
+            return SQL("(%s IS NULL OR %s = '')", column, column)
+        if self.field_type == 'boolean':
+            return SQL("%s IS NOT TRUE", column)
+        return SQL("%s IS NULL", column)
+
+    def _sql_match(self, column, ordinal=None):
+        kind, op, operand = self.kind, self.operator, self.operand
+        if kind == 'const':
+            return SQL("TRUE") if operand else SQL("FALSE")
+        if kind == 'ordinal' and ordinal is not None:
+            # a range on the indexed ordinal column, whose positions start at 1
+            if op == 'between':
+                return SQL("%s BETWEEN %s AND %s", ordinal, operand[0] + 1, operand[1] + 1)
+            return SQL("(%s > 0 AND %s %s %s)", ordinal, ordinal, SQL_OPERATORS[op], operand + 1)
+        if kind == 'ordinal':
+            # the set of options satisfying the rule is known upfront
+            matching = [option for option in self.options if self.matches(option)]
+            return SQL("%s::text = ANY(%s::text[])", column, matching)
+        if kind == 'numeric':
+            value, array_type = SQL("%s::float8", column), SQL("float8[]")
+        else:
+            # python compares strings by code point, like the "C" collation
+            value, array_type = SQL('%s::text COLLATE "C"', column), SQL("text[]")
+        if op == 'in':
+            return SQL("%s = ANY(%s::%s)", value, list(operand), array_type)
+        if op == 'not in':
+            return SQL("NOT (%s = ANY(%s::%s))", value, list(operand), array_type)
+        if op == 'between':
+            return SQL("%s BETWEEN %s AND %s", value, operand[0], operand[1])
+        return SQL("%s %s %s", value, SQL_OPERATORS[op], operand)
+
+    def to_sql(self, column, ordinal=None):
+        """Return the SQL expression of ``decide`` over ``column``, or None
+        when the rule never yields a decision
+
+        :param ordinal: SQL of the ordinal column of a dropdown, used for
+            comparisons on the order of its options
+        """
+        default = self.default or None
+        if self.kind == 'none':
+            return SQL("%s::varchar", default) if default else None
+        return SQL(
+            "CASE WHEN %s THEN %s::varchar WHEN %s THEN %s::varchar ELSE %s::varchar END",
+            self._sql_falsy(column), default, self._sql_match(column, ordinal), self.target, default,
+        )
+
+
+def _json_value_sql(column, key, field_type):
+    """Return the SQL reading ``key`` of the jsonb ``column`` as a value of
+    ``field_type``; values of another type read as NULL. The expression is
+    immutable, so it can be indexed. Dates stay ISO strings."""
+    if field_type in ('integer', 'float', 'many2one'):
+        return SQL(
+            "(CASE WHEN jsonb_typeof(%s -> %s) = 'number' THEN (%s ->> %s)::float8 END)",
+            column, key, column, key,
+        )
+    if field_type == 'boolean':
+        return SQL(
+            "(CASE WHEN jsonb_typeof(%s -> %s) = 'boolean' THEN (%s ->> %s)::boolean END)",
+            column, key, column, key,
+        )
+    return SQL("(%s ->> %s)", column, key)
+
+
+def _json_operand(field, value):
+    """Convert a python value of ``field`` to its JSON representation"""
+    if isinstance(value, models.BaseModel):
+        return value.id or None
+    if field.type == 'boolean':
+        return bool(value)
+    if field.type in ('integer', 'float', 'many2one'):
+        return value if value or value == 0 else None
+    if field.type == 'date':
+        return fields.Date.to_string(fields.Date.to_date(value)) or None
+    if field.type == 'datetime':
+        return fields.Datetime.to_string(fields.Datetime.to_datetime(value)) or None
+    return value or None
+
+
+def _compute_json_value(records, fname):
+    records._compute_custom_json_value(fname)
+
+
+def _compute_ordinal(records, fname):
+    records._compute_custom_ordinal(fname)
+
+
+def _inverse_json_values(records):
+    records._inverse_custom_json_values()
+
+
+def _search_json_value(records, operator, value, fname):
+    return records._search_custom_json_value(fname, operator, value)
 
 
 class RecruitmentCustomField(models.Model):
@@ -15,17 +354,15 @@ class RecruitmentCustomField(models.Model):
     description = fields.Text('Description', translate=True)
     sequence = fields.Integer('Sequence', default=10)
     active = fields.Boolean('Active', default=True)
-    field_type = fields.Selection([
-        ('char', 'Text'),
-        ('text', 'Multiline Text'),
-        ('integer', 'Integer'),
-        ('float', 'Decimal'),
-        ('boolean', 'Checkbox'),
-        ('date', 'Date'),
-        ('datetime', 'DateTime'),
-        ('selection', 'Dropdown'),
-        ('many2one', 'Many2one'),
-    ], string='Field Type', default='char', required=True)
+    field_type = fields.Selection(FIELD_TYPES, string='Field Type', default='char', required=True)
+    storage = fields.Selection(STORAGE_MODES, string='Storage', default='column', required=True,
+                               help='Table Column: one indexed column per field on the applicants table.\n'
+                                    'JSON: values kept in a single indexed JSON column, adding, changing '
+                                    'or removing the field does not alter the applicants table. '
+                                    'Such fields cannot be used to sort lists.')
+    json_index = fields.Boolean('Index Values',
+                                help='Index the values of this JSON field to speed up searches on it. '
+                                     'Applicant writes wait while the index is built.')
     selection_values = fields.Text('Selection Values', help='One per line for dropdown')
     relation_model = fields.Char('Related Model', help='e.g. res.partner')
     anchor_field = fields.Selection([
@@ -59,10 +396,29 @@ class RecruitmentCustomField(models.Model):
     target_decision = fields.Many2one('recruitment.status.config', string='Set Decision To', domain=[('active', '=', True)], ondelete='set null')
     default_decision = fields.Many2one('recruitment.status.config', string='Default Decision', domain=[('active', '=', True)], ondelete='set null', help='Set this decision if no validation rule matches')
 
+    # Online column type migration
+    migration_field_type = fields.Selection(FIELD_TYPES, string='Migrating To', readonly=True, copy=False)
+    migration_state = fields.Selection([
+        ('pending', 'Pending'),
+        ('backfill', 'Copying Values'),
+        ('index', 'Indexing'),
+        ('swap', 'Switching Column'),
+    ], string='Migration Status', readonly=True, copy=False)
+    migration_last_id = fields.Integer('Last Migrated Applicant', readonly=True, copy=False)
+
     def _column_name(self):
         self.ensure_one()
         return f"x_field{self.id}_value"
 
+    def _ordinal_column_name(self):
+        self.ensure_one()
+        return f"x_field{self.id}_ord"
+
+    def _has_ordinal(self):
+        """Whether the template has an ordinal column: stored dropdowns"""
+        self.ensure_one()
+        return self.field_type == 'selection' and self.storage == 'column'
+
     def _find_template_column(self, model=False):
         domain = [('name', 'in', [t._column_name() for t in self])]
         if model:
@@ -71,101 +427,771 @@ class RecruitmentCustomField(models.Model):
             domain.append(('model', '=', 'hr.applicant'))
         return self.env['ir.model.fields'].sudo().search(domain)
 
+    def _find_ordinal_column(self, model=False):
+        return self.env['ir.model.fields'].sudo().search([
+            ('name', 'in', [t._ordinal_column_name() for t in self]),
+            ('model', '=', model or 'hr.applicant'),
+        ])
+
     def _sync_all_template_columns(self):
         """Sync fields on hr.applicant model"""
-        self._sync_template_column('hr.applicant')
+        return self._sync_template_column('hr.applicant')
 
+    def _get_field_data(self, model):
+        self.ensure_one()
+        field_data = {
+            'name': self._column_name(),
+            'field_description': self.name,
+            'state': 'manual',
+            'model': model,
+            'model_id': self.env['ir.model']._get_id(model),
+            'ttype': self.field_type,
+            'copied': True,
+        }
+        if self.storage == 'json':
+            # no column: ir.model.fields computes it from custom_values
+            field_data.update(store=False, readonly=False, copied=False)
+
+        if self.field_type == 'selection' and self.selection_values:
+            options = [line.strip() for line in self.selection_values.split('\n') if line.strip()]
+            field_data['selection'] = str([(opt, opt) for opt in options])
+
+        if self.field_type == 'many2one' and self.relation_model:
+            field_data['relation'] = self.relation_model
+        return field_data
+
+    def _get_ordinal_field_data(self, model):
+        """Field computed by hr.applicant from the value (see IrModelFields)"""
+        self.ensure_one()
+        return {
+            'name': self._ordinal_column_name(),
+            'field_description': f'{self.name} (Order)',
+            'state': 'manual',
+            'model': model,
+            'model_id': self.env['ir.model']._get_id(model),
+            'ttype': 'integer',
+            'readonly': True,
+            'copied': False,
+        }
+
+    @profiled
     def _sync_template_column(self, model):
+        """Create or update the manual fields of the templates in one pass,
+        with a single reload of ``model``
+
+        Every create, write or unlink of an ``ir.model.fields`` reloads the
+        model. Existing fields are resolved in one query and unchanged ones
+        are left alone. Labels, options and relations are updated in SQL,
+        then obsolete fields are removed and new fields created in a single
+        batch each, whose reloads pick those changes up; without either, the
+        model is reloaded once at the end. Only a batch both removing and
+        creating fields (e.g. retyping a JSON field) reloads it twice.
+
+        :return: whether the fields of ``model`` changed
+        """
+        IrModelFields = self.env['ir.model.fields'].sudo()
+        existing = {
+            field.name: field
+            for field in self._find_template_column(model) | self._find_ordinal_column(model)
+        }
+
+        # If field exists and type changed, delete it first, like ordinal
+        # columns of templates that are no longer dropdowns
+        retyped = IrModelFields.browse([
+            existing.pop(column).id for template in self
+            if (column := template._column_name()) in existing
+            and existing[column].ttype != template.field_type
+        ] + [
+            existing.pop(ordinal).id for template in self
+            if (ordinal := template._ordinal_column_name()) in existing
+            and not template._has_ordinal()
+        ])
+
+        to_create = []
+        to_update = defaultdict(list)
         for template in self:
-            column = template._column_name()
-            
-            existing_field = self.env['ir.model.fields'].sudo().search([
-                ('name', '=', column),
-                ('model', '=', model)
-            ], limit=1)
-
-            # If field exists and type changed, delete it first
-            if existing_field and existing_field.ttype != template.field_type:
-                existing_field.sudo().unlink()
-                existing_field = False
-
-            field_data = {
-                'name': column,
-                'field_description': template.name,
-                'state': 'manual',
-                'model': model,
-                'model_id': self.env['ir.model']._get_id(model),
-                'ttype': template.field_type,
-                'copied': True,
-            }
+            fields_data = [template._get_field_data(model)]
+            if template._has_ordinal():
+                fields_data.append(template._get_ordinal_field_data(model))
+            for field_data in fields_data:
+                existing_field = existing.get(field_data['name'])
+                if not existing_field:
+                    to_create.append(field_data)
+                    continue
+                changes = tuple(
+                    (key, value) for key, value in field_data.items()
+                    if key in ('field_description', 'selection', 'relation', 'copied')
+                    and (existing_field[key] or False) != value
+                )
+                if changes:
+                    to_update[changes].append(existing_field.id)
+
+        for changes, field_ids in to_update.items():
+            self._write_template_fields(IrModelFields.browse(field_ids), dict(changes))
+        if retyped:
+            # through the ORM, which refuses to remove fields still used by
+            # views or other fields; reloads the model with the changes above
+            retyped.unlink()
 
-            if template.field_type == 'selection' and template.selection_values:
-                options = [line.strip() for line in template.selection_values.split('\n') if line.strip()]
-                field_data['selection'] = str([(opt, opt) for opt in options])
-            
-            if template.field_type == 'many2one' and template.relation_model:
-                field_data['relation'] = template.relation_model
-
-            if not existing_field:
-                field = self.env['ir.model.fields'].with_context(
-                    update_custom_fields=True
-                ).sudo().create(field_data)
-                
-                Model = self.env[model]
-                if Model._auto:
-                    tablename = Model._table
-                    indexname = make_index_name(tablename, column)
+        if to_create:
+            Model = self.env[model]
+            ordinals = [
+                field_data['name'] for field_data in to_create
+                if ORDINAL_FIELD_PATTERN.fullmatch(field_data['name'])
+            ]
+            if Model._auto:
+                # an existing column is not computed by the ORM on creation,
+                # the ordinals are filled in SQL below
+                for ordinal in ordinals:
+                    self.env.cr.execute(SQL(
+                        "ALTER TABLE %s ADD COLUMN IF NOT EXISTS %s int4",
+                        SQL.identifier(Model._table), SQL.identifier(ordinal),
+                    ))
+
+            # reloads the model, with the changes above
+            new_fields = IrModelFields.with_context(update_custom_fields=True).create(to_create)
+            self.env.registry.clear_cache('stable')
+
+            if Model._auto:
+                indexed = []
+                for field in new_fields.filtered('store'):
                     try:
-                        create_index(self.env.cr, indexname, tablename, [column], 'btree', f'{column} IS NOT NULL')
-                        field['index'] = True
+                        self._create_column_index(field.name)
+                        indexed.append(field.id)
                     except Exception:
                         pass
-            else:
-                existing_field.write(field_data)
+                if indexed:
+                    # the partial index exists already, flag the fields without
+                    # going through ir.model.fields.write and its model reload
+                    self.env.cr.execute(SQL(
+                        "UPDATE ir_model_fields SET index = TRUE WHERE id = ANY(%s)", indexed,
+                    ))
+                    new_fields.invalidate_recordset(['index'])
+            self.filtered(lambda template: template._ordinal_column_name() in ordinals)._reindex_ordinals()
+        elif to_update and not retyped:
+            self._reload_template_model(model)
 
-    def write(self, vals):
-        res = super().write(vals)
-        if any(key in vals for key in ['name', 'field_type', 'selection_values', 'relation_model', 'active', 'anchor_field', 'position', 'sequence']):
-            try:
+        self._sync_json_indexes()
+        return bool(retyped or to_update or to_create)
+
+    def _create_column_index(self, fname, drop=False):
+        """Create the partial index of the column ``fname`` of hr.applicant,
+        over its set values: not NULL, or above 0 for ordinals"""
+        tablename = self.env['hr.applicant']._table
+        indexname = make_index_name(tablename, fname)
+        if drop:
+            self.env.cr.execute(SQL("DROP INDEX IF EXISTS %s", SQL.identifier(indexname)))
+        where = f'{fname} > 0' if ORDINAL_FIELD_PATTERN.fullmatch(fname) else f'{fname} IS NOT NULL'
+        create_index(self.env.cr, indexname, tablename, [fname], 'btree', where)
+
+    @api.model
+    def _init_ordinal_columns(self):
+        """Create and fill the ordinal columns of the existing dropdown
+        templates, indexed over the set values only (upgrade step)"""
+        templates = self.with_context(active_test=False).search([
+            ('field_type', '=', 'selection'),
+            ('storage', '=', 'column'),
+        ])
+        for field in templates._find_ordinal_column():
+            templates._create_column_index(field.name, drop=True)
+        templates._sync_all_template_columns()
+        templates._reindex_ordinals()
+
+    def _write_template_fields(self, fields, changes):
+        """Apply ``changes`` to the manual ``fields`` in SQL, without the model
+        reload of ir.model.fields.write; the caller reloads the model"""
+        cr = self.env.cr
+        assignments = []
+        if 'field_description' in changes:
+            # the label in the current language, like a translated write
+            assignments.append(SQL(
+                "field_description = COALESCE(field_description, '{}'::jsonb) || jsonb_build_object(%s::text, %s::text)",
+                self.env.lang or 'en_US', changes['field_description'],
+            ))
+        for key in ('relation', 'copied'):
+            if key in changes:
+                assignments.append(SQL("%s = %s", SQL.identifier(key), changes[key] or None))
+        if assignments:
+            cr.execute(SQL(
+                "UPDATE ir_model_fields SET %s WHERE id = ANY(%s)", SQL(", ").join(assignments), fields.ids,
+            ))
+        if 'selection' in changes:
+            options = list(dict.fromkeys(value for value, __ in ast.literal_eval(changes['selection'] or '[]')))
+            for field in fields:
+                cr.execute(SQL(
+                    """
+                    DELETE FROM ir_model_fields_selection
+                     WHERE field_id = %(field_id)s AND NOT (value = ANY(%(options)s::varchar[]))
+                    RETURNING value
+                    """,
+                    field_id=field.id, options=options,
+                ))
+                removed = [value for value, in cr.fetchall()]
+                cr.execute(SQL(
+                    """
+                    INSERT INTO ir_model_fields_selection
+                           (field_id, value, name, sequence, create_uid, write_uid, create_date, write_date)
+                    SELECT %(field_id)s, option.value, jsonb_build_object('en_US', option.value), option.position - 1,
+                           %(uid)s, %(uid)s, NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+                      FROM unnest(%(options)s::varchar[]) WITH ORDINALITY AS option(value, position)
+                    ON CONFLICT (field_id, value) DO UPDATE
+                       SET sequence = EXCLUDED.sequence
+                    """,
+                    field_id=field.id, options=options, uid=self.env.uid,
+                ))
+                if removed and field.store:
+                    # values of removed options are cleared, like the ondelete
+                    # of a selection, and their rules evaluated again
+                    Model = self.env[field.model]
+                    Model.flush_model([field.name])
+                    cr.execute(SQL(
+                        "UPDATE %s SET %s = NULL WHERE %s = ANY(%s::varchar[]) RETURNING id",
+                        SQL.identifier(Model._table), SQL.identifier(field.name), SQL.identifier(field.name), removed,
+                    ))
+                    records = Model.browse([record_id for record_id, in cr.fetchall()])
+                    Model.invalidate_model([field.name])
+                    if records:
+                        records._schedule_dynamic_rules([field.name])
+        self.env['ir.model.fields.selection'].invalidate_model()
+        fields.invalidate_recordset()
+
+    def _json_index_name(self):
+        self.ensure_one()
+        return make_index_name(self.env['hr.applicant']._table, f'{self._column_name()}_json')
+
+    def _sync_json_indexes(self, rebuild=False):
+        """Create the expression indexes of the indexed JSON templates, drop
+        the others; ``rebuild`` recreates them (e.g. for another type)"""
+        table = self.env['hr.applicant']._table
+        for template in self.filtered(lambda template: template.storage == 'json'):
+            indexname = template._json_index_name()
+            wanted = template.active and template.storage == 'json' and template.json_index
+            if rebuild or not wanted:
+                self.env.cr.execute(SQL("DROP INDEX IF EXISTS %s", SQL.identifier(indexname)))
+            if wanted:
+                self.env.cr.execute(SQL(
+                    "CREATE INDEX IF NOT EXISTS %s ON %s ((%s))",
+                    SQL.identifier(indexname), SQL.identifier(table),
+                    _json_value_sql(SQL.identifier(JSON_VALUES_FIELD), template._column_name(), template.field_type),
+                ))
+
+    @profiled
+    def _reload_template_model(self, model='hr.applicant'):
+        """Load the manual fields of ``model`` again and update its table"""
+        registry = self.env.registry
+        self.env.flush_all()
+        registry.clear_cache('stable')
+        registry._setup_models__(self.env.cr, [model])
+        registry.init_models(self.env.cr, [model], dict(self.env.context, update_custom_fields=True))
+
+    @contextmanager
+    def _template_schema_change(self):
+        """Wrap the ir.model.fields changes of the templates
+
+        Those reload the models of this registry and would have every other
+        worker rebuild its whole registry. Instead, the other workers reload
+        hr.applicant alone once they see the template version change
+        (``_check_template_version``). The registry stays invalidated until
+        the commit, so that a rollback still resets it; on error the full
+        rebuild remains.
+        """
+        registry = self.env.registry
+        cr = self.env.cr
+        # only the first change of the transaction sees whether something
+        # else invalidated the registry
+        first = SCHEMA_CHANGE_KEY not in cr.postcommit.data
+        cr.postcommit.data[SCHEMA_CHANGE_KEY] = True
+        invalidated = registry.registry_invalidated
+        yield
+        _loaded_template_versions[registry.db_name] = (registry, self._get_template_version())
+        if not first:
+            return
+
+        @cr.postcommit.add
+        def restore_invalidation():
+            # committed before the changes are signaled to the other workers
+            registry.registry_invalidated = invalidated
+
+        @cr.postrollback.add
+        def reset_registry():
+            # rolled back, this registry is ahead of the database
+            registry.registry_invalidated = True
+            _loaded_template_versions[registry.db_name] = (registry, None)
+
+    def _register_hook(self):
+        super()._register_hook()
+        # the fields of a newly loaded registry are those of the current version
+        _loaded_template_versions[self.env.registry.db_name] = (self.env.registry, self._get_template_version())
+
+    @api.model
+    def _check_template_version(self):
+        """Reload hr.applicant if the templates changed since this worker
+        loaded it; the version is cached, so this is free until then"""
+        registry = self.env.registry
+        version = self._get_template_version()
+        loaded_registry, loaded_version = _loaded_template_versions.get(registry.db_name, (None, None))
+        if loaded_registry is registry:
+            if loaded_version == version:
+                return
+            invalidated = registry.registry_invalidated
+            registry._setup_models__(self.env.cr, ['hr.applicant'])
+            registry.registry_invalidated = invalidated
+            _logger.info("Reloaded hr.applicant for custom field templates version %s", version)
+        _loaded_template_versions[registry.db_name] = (registry, version)
+
+    def _defer_or_sync(self):
+        """Sync the templates now, or queue them when ``defer_field_sync`` is set"""
+        if self.env.context.get('defer_field_sync'):
+            pending = self.env.cr.precommit.data.setdefault(PENDING_SYNC_KEY, set())
+            if not pending:
+                # safety net for callers that never leave the deferred block
+                self.env.cr.precommit.add(self.with_context(defer_field_sync=False)._flush_field_sync)
+            pending.update(self.ids)
+            return
+        try:
+            with self._template_schema_change():
                 self._sync_all_template_columns()
-                self.env.registry.clear_cache('stable')
-                self.env.registry.init_models(self.env.cr, ['hr.applicant'], self.env.context)
+        except Exception:
+            pass
+
+    @api.model
+    def _flush_field_sync(self):
+        """Sync every template queued while ``defer_field_sync`` was set"""
+        pending = self.env.cr.precommit.data.pop(PENDING_SYNC_KEY, set())
+        templates = self.with_context(defer_field_sync=False).browse(sorted(pending)).exists()
+        if templates:
+            templates._defer_or_sync()
+
+    @contextmanager
+    def _defer_field_sync(self):
+        """Batch template changes: the model yielded by this context manager
+        queues column syncs, which run once with a single reload on exit::
+
+            with env['recruitment.custom.field']._defer_field_sync() as Templates:
+                for vals in rows:
+                    Templates.create(vals)
+        """
+        yield self.with_context(defer_field_sync=True)
+        self._flush_field_sync()
+
+    # ------------------------------------------------------------
+    # Online field type migration
+    # ------------------------------------------------------------
+
+    def _get_templates_to_migrate(self, field_type):
+        """Return the templates whose existing column has another type"""
+        fields_by_name = {field.name: field for field in self._find_template_column()}
+        return self.filtered(
+            lambda template: template.storage == 'column'
+            and template._column_name() in fields_by_name
+            and fields_by_name[template._column_name()].ttype != field_type
+        )
+
+    def _migration_names(self):
+        self.ensure_one()
+        column = self._column_name()
+        table = self.env['hr.applicant']._table
+        return {
+            'table': table,
+            'column': column,
+            'new_column': f'{column}_mig',
+            'prev_column': f'{column}_prev',
+            'index': make_index_name(table, column),
+            'new_index': make_index_name(table, f'{column}_mig'),
+            'function': f'{table}_{column}_mig_sync',
+        }
+
+    def _get_migration_cast(self, value):
+        """Return the SQL casting ``value`` from the current field type to
+        ``migration_field_type``; values that cannot be converted become NULL"""
+        self.ensure_one()
+        old_type, new_type = self.field_type, self.migration_field_type
+        text_types = ('char', 'text', 'selection')
+        options = [line.strip() for line in (self.selection_values or '').split('\n') if line.strip()]
+
+        if old_type in text_types:
+            text = SQL("btrim(%s::text)", value)
+        elif old_type == 'boolean':
+            text = SQL("CASE %s WHEN TRUE THEN 'True' WHEN FALSE THEN 'False' END", value)
+        elif old_type == 'datetime':
+            text = SQL("to_char(%s, 'YYYY-MM-DD HH24:MI:SS')", value)
+        else:
+            text = SQL("%s::text", value)
+
+        if new_type == 'selection':
+            return SQL("CASE WHEN %s = ANY(%s::text[]) THEN %s END", text, options, text)
+        if new_type in text_types:
+            return text
+        if new_type in ('integer', 'float'):
+            pg_type = SQL(COLUMN_TYPES[new_type])
+            if old_type in ('integer', 'float', 'many2one'):
+                if new_type == 'integer' and old_type == 'float':
+                    return SQL("CASE WHEN abs(%s) < 2147483647 THEN round(%s)::int4 END", value, value)
+                return SQL("%s::%s", value, pg_type)
+            if old_type == 'boolean':
+                return SQL("%s::int4::%s", value, pg_type)
+            if old_type in text_types and new_type == 'integer':
+                return SQL("CASE WHEN %s ~ %s THEN %s::int4 END", text, INTEGER_PATTERN, text)
+            if old_type in text_types:
+                # the exponent may still overflow float8, e.g. 1e999
+                return SQL(
+                    "CASE WHEN %s ~ %s THEN %s(%s, NULL::float8) END",
+                    text, NUMBER_PATTERN, SQL.identifier(TRY_CAST_FUNCTION), text,
+                )
+        if new_type == 'boolean':
+            if old_type in ('integer', 'float'):
+                return SQL("%s <> 0", value)
+            if old_type in text_types:
+                return SQL(
+                    "CASE WHEN lower(%s) = ANY(%s::text[]) THEN TRUE WHEN lower(%s) = ANY(%s::text[]) THEN FALSE END",
+                    text, TRUE_STRINGS, text, FALSE_STRINGS,
+                )
+        if new_type in ('date', 'datetime'):
+            pg_type = SQL(COLUMN_TYPES[new_type])
+            if old_type in ('date', 'datetime'):
+                return SQL("%s::%s", value, pg_type)
+            if old_type in text_types:
+                return SQL("%s(%s, NULL::%s)", SQL.identifier(TRY_CAST_FUNCTION), text, pg_type)
+        # no sensible conversion (e.g. to many2one): the old values are
+        # kept in the backup column
+        return SQL("NULL::%s", SQL(COLUMN_TYPES[new_type]))
+
+    @api.model
+    def _create_try_cast_function(self):
+        """Create the function ``_get_migration_cast`` uses for the casts
+        that may raise"""
+        self.env.cr.execute(SQL(
+            """
+            CREATE OR REPLACE FUNCTION %(try_cast)s(value text, INOUT target anyelement) AS $$
+            BEGIN
+                target := value;
+            EXCEPTION WHEN others THEN
+                target := NULL;
+            END $$ LANGUAGE plpgsql IMMUTABLE
+            """,
+            try_cast=SQL.identifier(TRY_CAST_FUNCTION),
+        ))
+
+    def _drop_migration_columns(self):
+        """Drop the migration and backup columns of the templates"""
+        cr = self.env.cr
+        for template in self:
+            names = template._migration_names()
+            cr.execute(SQL(
+                "DROP TRIGGER IF EXISTS %s ON %s",
+                SQL.identifier(names['function']), SQL.identifier(names['table']),
+            ))
+            cr.execute(SQL("DROP FUNCTION IF EXISTS %s()", SQL.identifier(names['function'])))
+            cr.execute(SQL(
+                "ALTER TABLE %s DROP COLUMN IF EXISTS %s, DROP COLUMN IF EXISTS %s",
+                SQL.identifier(names['table']),
+                SQL.identifier(names['new_column']), SQL.identifier(names['prev_column']),
+            ))
+
+    @api.model
+    def _cron_migrate_field_types(self, batch_size=MIGRATION_BATCH_SIZE):
+        """Move pending field type changes forward, committing after each step
+
+        pending:  add the new column and a trigger keeping it in sync
+        backfill: copy the casted values over, ``batch_size`` rows per step
+        index:    build the partial index, writes to the table wait meanwhile
+        swap:     rename the columns and switch the field type in one short
+                  transaction, the old column is kept as ``<column>_prev``
+        """
+        for template in self.search([('migration_state', '!=', False)]):
+            try:
+                while template.migration_state:
+                    getattr(template, f'_migrate_{template.migration_state}')(batch_size)
+                    self.env.cr.commit()
             except Exception:
-                pass
+                self.env.cr.rollback()
+                _logger.exception("Field type migration of %s postponed", template._column_name())
+
+    def _migrate_pending(self, batch_size):
+        names = self._migration_names()
+        if not self._find_template_column():
+            # nothing to migrate anymore, switch the type directly
+            self.with_context(field_type_migrated=True).write({
+                'field_type': self.migration_field_type,
+                'migration_field_type': False,
+                'migration_state': False,
+            })
+            return
+        cr = self.env.cr
+        cr.execute(SQL("SET LOCAL lock_timeout = %s", MIGRATION_LOCK_TIMEOUT))
+        self._create_try_cast_function()
+        cr.execute(SQL(
+            "ALTER TABLE %s ADD COLUMN IF NOT EXISTS %s %s",
+            SQL.identifier(names['table']), SQL.identifier(names['new_column']),
+            SQL(COLUMN_TYPES[self.migration_field_type]),
+        ))
+        # writes made during the backfill are mirrored into the new column
+        cr.execute(SQL(
+            """
+            CREATE OR REPLACE FUNCTION %(function)s() RETURNS trigger AS $$
+            BEGIN
+                NEW.%(new_column)s := %(cast)s;
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql;
+            DROP TRIGGER IF EXISTS %(function)s ON %(table)s;
+            CREATE TRIGGER %(function)s BEFORE INSERT OR UPDATE OF %(column)s ON %(table)s
+                FOR EACH ROW EXECUTE FUNCTION %(function)s();
+            """,
+            function=SQL.identifier(names['function']),
+            table=SQL.identifier(names['table']),
+            column=SQL.identifier(names['column']),
+            new_column=SQL.identifier(names['new_column']),
+            cast=self._get_migration_cast(SQL("NEW.%s", SQL.identifier(names['column']))),
+        ))
+        self.write({'migration_state': 'backfill', 'migration_last_id': 0})
+
+    def _migrate_backfill(self, batch_size):
+        names = self._migration_names()
+        cr = self.env.cr
+        start_id = self.migration_last_id
+        cr.execute(SQL(
+            "SELECT max(id) FROM (SELECT id FROM %s WHERE id > %s ORDER BY id LIMIT %s) batch",
+            SQL.identifier(names['table']), start_id, batch_size,
+        ))
+        last_id = cr.fetchone()[0]
+        if last_id is None:
+            self.migration_state = 'index'
+            return
+        cr.execute(SQL(
+            "UPDATE %s SET %s = %s WHERE id > %s AND id <= %s",
+            SQL.identifier(names['table']), SQL.identifier(names['new_column']),
+            self._get_migration_cast(SQL.identifier(names['column'])), start_id, last_id,
+        ))
+        # progress is saved in SQL, without the cache invalidation of write
+        cr.execute(SQL(
+            "UPDATE %s SET migration_last_id = %s WHERE id = %s",
+            SQL.identifier(self._table), last_id, self.id,
+        ))
+        self.invalidate_recordset(['migration_last_id'])
+        _logger.info("Migrated %s up to applicant %s", names['column'], last_id)
+
+    def _migrate_index(self, batch_size):
+        names = self._migration_names()
+        cr = self.env.cr
+        # CREATE INDEX CONCURRENTLY would wait for the snapshot of this job
+        # and of its cron lock forever: build it in the job transaction, and
+        # give up rather than hold the writes queued behind another lock
+        cr.execute(SQL("SET LOCAL lock_timeout = %s", MIGRATION_LOCK_TIMEOUT))
+        cr.execute(SQL("DROP INDEX IF EXISTS %s", SQL.identifier(names['new_index'])))
+        cr.execute(SQL(
+            "CREATE INDEX %s ON %s (%s) WHERE %s IS NOT NULL",
+            SQL.identifier(names['new_index']), SQL.identifier(names['table']),
+            SQL.identifier(names['new_column']), SQL.identifier(names['new_column']),
+        ))
+        self.migration_state = 'swap'
+
+    def _migrate_swap(self, batch_size):
+        names = self._migration_names()
+        field = self._find_template_column()
+        cr = self.env.cr
+        self.env.flush_all()
+        cr.execute(SQL("SET LOCAL lock_timeout = %s", MIGRATION_LOCK_TIMEOUT))
+        cr.execute(SQL(
+            """
+            DROP TRIGGER IF EXISTS %(function)s ON %(table)s;
+            DROP FUNCTION IF EXISTS %(function)s();
+            DROP INDEX IF EXISTS %(index)s;
+            ALTER TABLE %(table)s DROP COLUMN IF EXISTS %(prev_column)s;
+            ALTER TABLE %(table)s DROP CONSTRAINT IF EXISTS %(foreign_key)s;
+            ALTER TABLE %(table)s RENAME COLUMN %(column)s TO %(prev_column)s;
+            ALTER TABLE %(table)s RENAME COLUMN %(new_column)s TO %(column)s;
+            ALTER INDEX %(new_index)s RENAME TO %(index)s;
+            UPDATE ir_model_fields SET ttype = %(ttype)s, relation = %(relation)s WHERE id = %(field_id)s;
+            DELETE FROM ir_model_fields_selection WHERE field_id = %(field_id)s;
+            """,
+            function=SQL.identifier(names['function']),
+            table=SQL.identifier(names['table']),
+            index=SQL.identifier(names['index']),
+            new_index=SQL.identifier(names['new_index']),
+            column=SQL.identifier(names['column']),
+            new_column=SQL.identifier(names['new_column']),
+            prev_column=SQL.identifier(names['prev_column']),
+            foreign_key=SQL.identifier(f"{names['table']}_{names['column']}_fkey"),
+            ttype=self.migration_field_type,
+            relation=(self.migration_field_type == 'many2one' and self.relation_model) or None,
+            field_id=field.id,
+        ))
+        self.env.invalidate_all()
+        # the loaded hr.applicant still has the old field type: do not let it
+        # touch the schema, every worker rebuilds its registry instead
+        self.env.registry.registry_invalidated = True
+        self.with_context(field_type_migrated=True).write({
+            'field_type': self.migration_field_type,
+            'migration_field_type': False,
+            'migration_state': False,
+            'migration_last_id': 0,
+        })
+        _logger.info("Switched %s to type %s", names['column'], self.field_type)
+
+    @ormcache()
+    def _get_compiled_rules(self):
+        """Return the CompiledRule of every active auto-decision template, in template order"""
+        templates = self.sudo().search([
+            ('active', '=', True),
+            ('validation_active', '=', True)
+        ])
+        return tuple(CompiledRule.from_template(template) for template in templates)
+
+    @ormcache()
+    def _get_rule_dependencies(self):
+        """Return ``{column: rules}``, the compiled rules reading each column"""
+        dependencies = defaultdict(list)
+        for rule in self._get_compiled_rules():
+            dependencies[rule.column].append(rule)
+        return {column: tuple(rules) for column, rules in dependencies.items()}
+
+    @ormcache()
+    def _get_ordinal_positions(self):
+        """Return ``{column: {option: position}}`` of the templates with an
+        ordinal column, positions starting at 1 like the stored ones"""
+        result = {}
+        templates = self.sudo().with_context(active_test=False).search([
+            ('field_type', '=', 'selection'),
+            ('storage', '=', 'column'),
+        ])
+        for template in templates:
+            positions = result[template._column_name()] = {}
+            options = [line.strip() for line in (template.selection_values or '').split('\n') if line.strip()]
+            for position, option in enumerate(options, 1):
+                positions.setdefault(option, position)
+        return result
+
+    def _reindex_ordinals(self):
+        """Recompute the stored positions of the values of the templates in
+        SQL, after their options changed"""
+        Applicant = self.env['hr.applicant'].sudo()
+        positions = self._get_ordinal_positions()
+        for template in self:
+            column, ordinal = template._column_name(), template._ordinal_column_name()
+            if ordinal not in Applicant._fields or column not in positions:
+                continue
+            Applicant.flush_model([column, ordinal])
+            position = SQL(
+                "COALESCE((%s::jsonb ->> %s::text)::int, 0)",
+                json.dumps(positions[column]), SQL.identifier(column),
+            )
+            self.env.cr.execute(SQL(
+                "UPDATE %(table)s SET %(ordinal)s = %(position)s WHERE %(ordinal)s IS DISTINCT FROM %(position)s",
+                table=SQL.identifier(Applicant._table),
+                ordinal=SQL.identifier(ordinal),
+                position=position,
+            ))
+            _logger.info("Reindexed %s: %s applicant(s) updated", ordinal, self.env.cr.rowcount)
+            Applicant.invalidate_model([ordinal])
+
+    @ormcache('self.env.lang')
+    def _get_template_layout(self):
+        """Return the TemplateLayout of every active template, in view order"""
+        return tuple(
+            TemplateLayout(template.id, template._column_name(), template.name,
+                           template.field_type, template.anchor_field, template.position)
+            for template in self.sudo().search([('active', '=', True)], order='sequence, id')
+        )
+
+    @api.model
+    def _get_template_version(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(TEMPLATE_VERSION_PARAM, 0))
+
+    @api.model
+    def _bump_template_version(self):
+        """Invalidate cached hr.applicant views and labels built from the templates"""
+        version = self._get_template_version() + 1
+        self.env['ir.config_parameter'].sudo().set_param(TEMPLATE_VERSION_PARAM, version)
+        return version
+
+    def write(self, vals):
+        if 'storage' in vals and any(template.storage != vals['storage'] for template in self):
+            raise UserError(_('The storage of a custom field cannot be changed once it is created.'))
+        if 'field_type' in vals and not self.env.context.get('field_type_migrated'):
+            migrating = self._get_templates_to_migrate(vals['field_type'])
+            if migrating:
+                # keep the current type until the column is migrated online
+                if migrating.filtered('migration_state'):
+                    raise UserError(_('A field type change is already in progress for this field.'))
+                other_vals = {key: value for key, value in vals.items() if key != 'field_type'}
+                if self - migrating:
+                    (self - migrating).write(vals)
+                migrating.write(dict(
+                    other_vals,
+                    migration_field_type=vals['field_type'],
+                    migration_state='pending',
+                    migration_last_id=0,
+                ))
+                self.env.ref('peepl_hr_custom.ir_cron_migrate_custom_field_type')._trigger()
+                return True
+        res = super().write(vals)
+        if any(key in vals for key in CACHED_FIELDS):
+            self.env.registry.clear_cache()
+        if any(key in vals for key in LAYOUT_FIELDS):
+            self._bump_template_version()
+            self._defer_or_sync()
+        if 'selection_values' in vals:
+            self._reindex_ordinals()
+        if vals.keys() & {'json_index', 'field_type', 'active'}:
+            self._sync_json_indexes(rebuild='field_type' in vals)
         return res
 
     def unlink(self):
-        try:
+        self._drop_migration_columns()
+        for template in self.filtered(lambda template: template.storage == 'json'):
+            self.env.cr.execute(SQL("DROP INDEX IF EXISTS %s", SQL.identifier(template._json_index_name())))
+        with self._template_schema_change():
+            # raises if the fields are still used, e.g. by a custom view; the
+            # unlink reloads hr.applicant. Ordinals go first, as they depend
+            # on the values.
+            self._find_ordinal_column().unlink()
             self._find_template_column().unlink()
-        except Exception:
-            pass
-        res = super().unlink()
-        try:
-            self.env.registry.clear_cache('stable')
-            self.env.registry.init_models(self.env.cr, ['hr.applicant'], self.env.context)
-        except Exception:
-            pass
+            res = super().unlink()
+            self.env.registry.clear_cache()
+            self._bump_template_version()
+        return res
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        self._bump_template_version()
+        records._defer_or_sync()
+        return records
+    
+    def action_reapply_rules(self):
+        """Re-evaluate the auto-decision rules over all existing applicants"""
+        # the update runs as superuser, over every applicant
+        self.check_access('write')
+        updated = self.env['hr.applicant'].sudo()._reapply_dynamic_rules_sql()
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'type': 'warning',
-                'message': 'Field deleted. Please refresh the page manually (F5) to avoid errors.',
-                'sticky': True,
+                'type': 'success',
+                'message': f'Rules re-applied: {updated} applicant(s) updated.',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
             }
         }
 
-    @api.model
-    def create(self, vals):
-        record = super().create(vals)
-        try:
-            record._sync_all_template_columns()
-            self.env.registry.clear_cache('stable')
-            self.env.registry.init_models(self.env.cr, ['hr.applicant'], self.env.context)
-        except Exception:
-            pass
-        return record
-    
+    def action_simulate_rule(self):
+        """Open the what-if simulation of the auto-decision rule"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Simulate Auto-Decision'),
+            'res_model': 'recruitment.rule.simulation',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'default_template_id': self.id,
+                'default_validation_operator': self.validation_operator,
+                'default_validation_value': self.validation_value,
+                'default_target_decision': self.target_decision.id,
+                'default_default_decision': self.default_decision.id,
+            },
+        }
+
     def action_refresh_page(self):
         return {
             'type': 'ir.actions.client',
@@ -186,9 +1212,129 @@ class RecruitmentCustomFieldMixin(models.AbstractModel):
     _name = 'recruitment.custom.field.mixin'
     _description = 'Recruitment Custom Field Mixin'
 
+    custom_values = fields.Json('Custom Field Values', help='Values of the custom fields stored as JSON')
+
+    def _custom_value_sql(self, fname, column=None):
+        """Return the SQL reading the custom field ``fname``, its column or
+        its key in ``column`` (``custom_values`` by default) for JSON fields"""
+        field = self._fields[fname]
+        if field.store:
+            return SQL.identifier(fname)
+        return _json_value_sql(column or SQL.identifier(JSON_VALUES_FIELD), fname, field.type)
+
+    def _compute_custom_json_value(self, fname):
+        field = self._fields[fname]
+        values = [(record, (record.custom_values or {}).get(fname)) for record in self]
+        if field.type == 'many2one':
+            ids = {value for __, value in values if isinstance(value, int)}
+            existing = set(self.env[field.comodel_name].browse(ids).exists().ids)
+            values = [(record, value if value in existing else False) for record, value in values]
+        for record, value in values:
+            try:
+                record[fname] = False if value is None else value
+            except (TypeError, ValueError):
+                # value of a former field type or selection
+                record[fname] = False
+
+    def _inverse_custom_json_values(self):
+        json_fields = [field for field in self._fields.values() if field.inverse is _inverse_json_values]
+        # read every value before custom_values changes under them
+        updates = [
+            (record, {field.name: _json_operand(field, record[field.name]) for field in json_fields})
+            for record in self
+        ]
+        for record, values in updates:
+            record.custom_values = {
+                key: value
+                for key, value in dict(record.custom_values or {}, **values).items()
+                if value is not None
+            }
+
+    def _search_custom_json_value(self, fname, operator, value):
+        field = self._fields[fname]
+        if field.type == 'many2one' and isinstance(value, str):
+            # search on the name of the related records
+            positive = {'!=': '=', 'not like': 'like', 'not ilike': 'ilike'}.get(operator, operator)
+            comodel_ids = list(self.env[field.comodel_name]._search([('display_name', positive, value)]))
+            operator, value = ('in' if positive == operator else 'not in'), comodel_ids
+
+        query = self.sudo().with_context(active_test=False)._search([])
+        column = self._field_to_sql(query.table, JSON_VALUES_FIELD, query)
+        expression = _json_value_sql(column, fname, field.type)
+
+        def operand(value):
+            value = _json_operand(field, value)
+            return float(value) if field.type in ('integer', 'float', 'many2one') else value
+
+        # unset booleans read as False
+        empty = SQL("%s IS NOT TRUE" if field.type == 'boolean' else "%s IS NULL", expression)
+
+        if operator in ('=', '!=') and (value is False or value is None):
+            condition = empty
+            if operator == '!=':
+                condition = SQL("NOT (%s)", condition)
+        elif operator == '=':
+            # containment is served by the GIN index
+            condition = SQL("%s @> %s::jsonb", column, json.dumps({fname: operand(value)}))
+        elif operator == '!=':
+            condition = SQL("%s IS DISTINCT FROM %s", expression, operand(value))
+        elif operator in ORDER_OPERATORS:
+            condition = SQL("%s %s %s", expression, SQL_OPERATORS[operator], operand(value))
+        elif operator in ('in', 'not in'):
+            values = [operand(item) for item in value if item is not False and item is not None]
+            condition = SQL("%s = ANY(%s)", expression, values)
+            if len(values) < len(value):
+                condition = SQL("(%s OR %s)", condition, empty)
+            if operator == 'not in':
+                condition = SQL("(%s) IS NOT TRUE", condition)
+        elif operator in JSON_TEXT_OPERATORS:
+            pattern = str(value) if operator.startswith('=') else f'%{value}%'
+            condition = SQL("(%s ->> %s) %s %s", column, fname, JSON_TEXT_OPERATORS[operator], pattern)
+            if operator.startswith('not'):
+                # like the ORM on columns, missing values match negated patterns
+                condition = SQL("(%s OR (%s ->> %s) IS NULL)", condition, column, fname)
+        else:
+            raise UserError(_('Operator %(operator)s is not supported on %(field)s.', operator=operator, field=field.string))
+        query.add_where(condition)
+        return [('id', 'in', query)]
+
+    def _custom_ordinal_fname(self, fname):
+        """Return the ordinal field of the dropdown custom field ``fname``, if any"""
+        if not isinstance(fname, str) or not CUSTOM_FIELD_PATTERN.fullmatch(fname):
+            return None
+        ordinal = fname.removesuffix('_value') + '_ord'
+        return ordinal if ordinal in self._fields else None
+
+    def _custom_ordinal_sql(self, fname):
+        """Return the SQL reading the ordinal column of ``fname``, or None"""
+        ordinal = self._custom_ordinal_fname(fname)
+        return SQL.identifier(ordinal) if ordinal else None
+
+    def _compute_custom_ordinal(self, fname):
+        value_fname = ORDINAL_FIELD_PATTERN.fullmatch(fname).group(1) + '_value'
+        positions = self.env['recruitment.custom.field']._get_ordinal_positions().get(value_fname, {})
+        for record in self:
+            record[fname] = positions.get(record[value_fname], 0)
+
+    def _order_field_to_sql(self, alias, field_name, direction, nulls, query):
+        # dropdowns sort in the order of their options, on the ordinal column
+        ordinal = self._custom_ordinal_fname(field_name)
+        return super()._order_field_to_sql(alias, ordinal or field_name, direction, nulls, query)
+
+    def _condition_to_sql(self, alias, field_expr, operator, value, query):
+        # ordered comparisons on dropdowns follow the order of the options,
+        # like auto-decision rules, as a range on the ordinal column
+        ordinal = self._custom_ordinal_fname(field_expr)
+        if ordinal and operator in ORDER_OPERATORS and isinstance(value, str):
+            positions = self.env['recruitment.custom.field']._get_ordinal_positions().get(field_expr, {})
+            if value in positions:
+                column = self._field_to_sql(alias, ordinal, query)
+                return SQL("(%s > 0 AND %s %s %s)", column, column, SQL_OPERATORS[operator], positions[value])
+        return super()._condition_to_sql(alias, field_expr, operator, value, query)
+
     def _get_template_fnames(self):
-        templates = self.env['recruitment.custom.field'].search([('active', '=', True)])
-        return [fname for template in templates if (fname := template._column_name()) in self]
+        layout = self.env['recruitment.custom.field']._get_template_layout()
+        return [template.column for template in layout if template.column in self]
 
     def _get_field_responses(self):
         """Return dict of template_id: response for this record"""
@@ -200,19 +1346,24 @@ class RecruitmentCustomFieldMixin(models.AbstractModel):
         return result
 
     @api.model
+    @profiled
     def fields_get(self, allfields=None, attributes=None):
         fields = super().fields_get(allfields, attributes)
         try:
             if not self.env.context.get("studio"):
-                templates = self.env['recruitment.custom.field'].search([('active', '=', True)])
-                for template in templates:
-                    fname = template._column_name()
-                    if fname in fields:
-                        fields[fname]['string'] = template.name
+                for template in self.env['recruitment.custom.field']._get_template_layout():
+                    if template.column in fields:
+                        fields[template.column]['string'] = template.name
         except Exception:
             pass
         return fields
 
+    @api.model
+    def _get_view_cache_key(self, view_id=None, view_type='form', **options):
+        # patched archs are cached per template-set version
+        key = super()._get_view_cache_key(view_id, view_type, **options)
+        return key + (self.env['recruitment.custom.field']._get_template_version(),)
+
     def _get_view(self, view_id=None, view_type='form', **options):
         arch, view = super()._get_view(view_id, view_type, **options)
         try:
@@ -220,199 +1371,227 @@ class RecruitmentCustomFieldMixin(models.AbstractModel):
         except Exception:
             return arch, view
 
+    @profiled
     def _patch_view(self, arch, view, view_type):
         try:
             if not self.env.context.get("studio"):
-                templates = self.env['recruitment.custom.field'].search([('active', '=', True)], order='sequence, id')
-                
+                layout = self.env['recruitment.custom.field']._get_template_layout()
+
                 if view_type == 'list':
+                    root = arch
+                    widgets = ('date', 'datetime', 'float', 'integer')
+                    base_attrs = {'optional': 'show', 'width': '150px'}
+                elif view_type == 'form':
+                    root = arch.find('.//page[@name="assessment"]')
+                    widgets = ('date', 'datetime')
+                    base_attrs = {}
+                else:
+                    root = None
+
+                if root is not None:
                     # Track inserted fields to avoid duplicates
                     inserted = set()
-                    
-                    for template in templates:
-                        fname = template._column_name()
+                    anchors = {}
+
+                    for template in layout:
+                        fname = template.column
                         if fname not in self._fields or fname in inserted:
                             continue
-                        
-                        anchor_node = arch.find(f'.//field[@name="{template.anchor_field}"]')
+
+                        if template.anchor_field not in anchors:
+                            anchors[template.anchor_field] = root.find(f'.//field[@name="{template.anchor_field}"]')
+                        anchor_node = anchors[template.anchor_field]
                         if anchor_node is None:
                             continue
-                        
-                        field_attrs = {
-                            'name': fname,
-                            'optional': 'show',
-                            'width': '150px',
-                        }
-                        
+
+                        field_attrs = {'name': fname, **base_attrs}
+
                         if template.field_type == 'text':
                             field_attrs['widget'] = 'text'
                         elif template.field_type == 'boolean':
                             field_attrs['widget'] = 'boolean_toggle'
-                        elif template.field_type in ('date', 'datetime', 'float', 'integer'):
+                        elif template.field_type in widgets:
                             field_attrs['widget'] = template.field_type
-                        
+
                         new_field = E.field(**field_attrs)
                         if template.position == 'before':
                             anchor_node.addprevious(new_field)
                         else:
                             anchor_node.addnext(new_field)
-                        
+
                         inserted.add(fname)
-                
-                elif view_type == 'form':
-                    page_assessment = arch.find('.//page[@name="assessment"]')
-                    if page_assessment is not None:
-                        inserted = set()
-                        
-                        for template in templates:
-                            fname = template._column_name()
-                            if fname not in self._fields or fname in inserted:
-                                continue
-                            
-                            anchor_node = page_assessment.find(f'.//field[@name="{template.anchor_field}"]')
-                            if anchor_node is None:
-                                continue
-                            
-                            field_attrs = {'name': fname}
-                            
-                            if template.field_type == 'text':
-                                field_attrs['widget'] = 'text'
-                            elif template.field_type == 'boolean':
-                                field_attrs['widget'] = 'boolean_toggle'
-                            elif template.field_type in ('date', 'datetime'):
-                                field_attrs['widget'] = template.field_type
-                            
-                            new_field = E.field(**field_attrs)
-                            if template.position == 'before':
-                                anchor_node.addprevious(new_field)
-                            else:
-                                anchor_node.addnext(new_field)
-                            
-                            inserted.add(fname)
         except Exception:
             pass
-        
+
         return arch, view
 
+    @profiled
+    def _apply_dynamic_rules(self, columns=None):
+        """Apply validation rules to update hire_decision
 
-    def _apply_dynamic_rules(self):
-        """Apply validation rules to update hire_decision"""
-        ops = {'=': operator.eq, '!=': operator.ne, '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
-        
-        templates = self.env['recruitment.custom.field'].search([
-            ('active', '=', True),
-            ('validation_active', '=', True)
-        ])
-        
+        Rules take precedence in template order: the last template yielding a
+        decision wins. They are evaluated from the last one, each record
+        stopping at its first decision, so lower ranked rules only run for
+        records no higher ranked rule decided. Records are then written
+        grouped by decision.
+
+        :param columns: written custom columns, nothing is evaluated unless
+            a rule reads one of them (all rules apply when not given)
+        """
+        Template = self.env['recruitment.custom.field']
+        if columns is not None:
+            dependencies = Template._get_rule_dependencies()
+            if not any(column in dependencies for column in columns):
+                return
+        decisions = {}
+        pending = self
+        for rule in reversed(Template._get_compiled_rules()):
+            if not pending:
+                break
+            if rule.column not in self._fields:
+                continue
+            decided = []
+            for record in pending:
+                decision = rule.decide(record[rule.column])
+                if decision:
+                    decisions[record.id] = decision
+                    decided.append(record.id)
+            if decided:
+                pending -= self.browse(decided)
+
+        to_write = defaultdict(list)
         for record in self:
-            for template in templates:
-                fname = template._column_name()
-                if fname not in record or not record[fname]:
-                    # Set default decision if field has value and default is set
-                    if fname in record and template.default_decision:
-                        record.hire_decision = template.default_decision.code
-                    continue
-                
-                # Check if validation rule exists
-                if not template.validation_operator or not template.target_decision:
-                    # No validation rule, use default if set
-                    if template.default_decision:
-                        record.hire_decision = template.default_decision.code
-                    continue
-                
-                try:
-                    user_val = record[fname]
-                    rule_val = template.validation_value
-                    op = template.validation_operator
-                    rule_matched = False
-                    
-                    # Handle 'in' operator
-                    if op == 'in':
-                        values = [v.strip() for v in rule_val.split(',')]
-                        if template.field_type in ('integer', 'float'):
-                            values = [float(v) for v in values]
-                            user_val = float(user_val)
-                        if user_val in values:
-                            record.hire_decision = template.target_decision.code
-                            rule_matched = True
-                    
-                    # Handle 'not in' operator
-                    elif op == 'not in':
-                        values = [v.strip() for v in rule_val.split(',')]
-                        if template.field_type in ('integer', 'float'):
-                            values = [float(v) for v in values]
-                            user_val = float(user_val)
-                        if user_val not in values:
-                            record.hire_decision = template.target_decision.code
-                            rule_matched = True
-                    
-                    # Handle 'between' operator
-                    elif op == 'between':
-                        min_val, max_val = [v.strip() for v in rule_val.split(',')]
-                        if template.field_type in ('integer', 'float'):
-                            min_val, max_val = float(min_val), float(max_val)
-                            user_val = float(user_val)
-                            if min_val <= user_val <= max_val:
-                                record.hire_decision = template.target_decision.code
-                                rule_matched = True
-                        else:
-                            if template.selection_values:
-                                options = [v.strip() for v in template.selection_values.split('\n') if v.strip()]
-                                try:
-                                    min_idx = options.index(min_val)
-                                    max_idx = options.index(max_val)
-                                    user_idx = options.index(user_val)
-                                    if min_idx <= user_idx <= max_idx:
-                                        record.hire_decision = template.target_decision.code
-                                        rule_matched = True
-                                except ValueError:
-                                    pass
-                    
-                    # Standard operators for selection
-                    elif template.field_type == 'selection' and op in ('>', '>=', '<', '<='):
-                        if template.selection_values:
-                            options = [v.strip() for v in template.selection_values.split('\n') if v.strip()]
-                            try:
-                                user_idx = options.index(user_val)
-                                rule_idx = options.index(rule_val)
-                                if ops[op](user_idx, rule_idx):
-                                    record.hire_decision = template.target_decision.code
-                                    rule_matched = True
-                            except ValueError:
-                                pass
-                    
-                    # Standard operators for numeric
-                    else:
-                        if template.field_type in ('integer', 'float'):
-                            user_val = float(user_val)
-                            rule_val = float(rule_val)
-                        
-                        if ops[op](user_val, rule_val):
-                            record.hire_decision = template.target_decision.code
-                            rule_matched = True
-                    
-                    # If no rule matched, use default
-                    if not rule_matched and template.default_decision:
-                        record.hire_decision = template.default_decision.code
-                        
-                except:
-                    # On error, use default if set
-                    if template.default_decision:
-                        record.hire_decision = template.default_decision.code
-                    continue
-    
+            decision = decisions.get(record.id)
+            if decision and record.hire_decision != decision:
+                to_write[decision].append(record.id)
+        for decision, ids in to_write.items():
+            self.browse(ids).write({'hire_decision': decision})
+
     @api.model
-    def create(self, vals):
-        record = super().create(vals)
-        record._apply_dynamic_rules()
-        return record
+    @profiled
+    def _reapply_dynamic_rules_sql(self, chunk_size=RULE_SQL_CHUNK_SIZE):
+        """Set-based equivalent of ``_apply_dynamic_rules`` over the whole table
+
+        Each rule becomes a CASE expression; COALESCE over the rules in
+        reverse order keeps the last decision, like the ORM evaluation.
+        The table is walked in id ranges of ``chunk_size``.
+
+        :return: number of applicants whose decision changed
+        """
+        rules = [
+            rule for rule in self.env['recruitment.custom.field']._get_compiled_rules()
+            if rule.column in self._fields
+        ]
+        expressions = [
+            expression for rule in reversed(rules)
+            if (expression := rule.to_sql(
+                self._custom_value_sql(rule.column), self._custom_ordinal_sql(rule.column),
+            )) is not None
+        ]
+        if not expressions:
+            return 0
+        decision = SQL("COALESCE(%s, %s)", SQL(", ").join(expressions), SQL.identifier('hire_decision'))
+
+        self.flush_model()
+        self.env.cr.execute(SQL("SELECT MIN(id), MAX(id) FROM %s", SQL.identifier(self._table)))
+        min_id, max_id = self.env.cr.fetchone()
+        if min_id is None:
+            return 0
+
+        updated = 0
+        for start in range(min_id, max_id + 1, chunk_size):
+            self.env.cr.execute(SQL(
+                """
+                UPDATE %(table)s
+                   SET hire_decision = %(decision)s,
+                       write_uid = %(uid)s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                 WHERE id >= %(start)s AND id < %(stop)s
+                   AND hire_decision IS DISTINCT FROM %(decision)s
+                """,
+                table=SQL.identifier(self._table),
+                decision=decision,
+                uid=self.env.uid,
+                start=start,
+                stop=start + chunk_size,
+            ))
+            updated += self.env.cr.rowcount
+            _logger.info(
+                "Re-applied recruitment rules on ids %s-%s (%d%%), %s decision(s) changed so far",
+                start, min(start + chunk_size - 1, max_id),
+                100 * (min(start + chunk_size, max_id + 1) - min_id) // (max_id + 1 - min_id),
+                updated,
+            )
+        self.invalidate_model(['hire_decision', 'write_uid', 'write_date'])
+        if updated:
+            self.env['recruitment.funnel.snapshot']._rebuild()
+        return updated
+
+    def _dynamic_rules_deferred(self):
+        """Whether rules are left to the queue cron, from the
+        ``defer_dynamic_rules`` context key or the system parameter"""
+        deferred = self.env.context.get('defer_dynamic_rules')
+        if deferred is None:
+            deferred = self.env['ir.config_parameter'].sudo().get_param(DEFERRED_RULES_PARAM) == '1'
+        return deferred
+
+    def _schedule_dynamic_rules(self, columns=None):
+        """Apply the rules now, or queue the records in deferred mode"""
+        if not self._dynamic_rules_deferred():
+            self._apply_dynamic_rules(columns)
+            return
+        Template = self.env['recruitment.custom.field']
+        if columns is None:
+            needed = bool(Template._get_compiled_rules())
+        else:
+            dependencies = Template._get_rule_dependencies()
+            needed = any(column in dependencies for column in columns)
+        if needed:
+            self.env['recruitment.rule.queue']._enqueue(self)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._schedule_dynamic_rules()
+        return records
     
     def write(self, vals):
         res = super().write(vals)
-        if any(k.startswith('x_field') for k in vals.keys()):
-            self._apply_dynamic_rules()
+        columns = [k for k in vals if k.startswith('x_field')]
+        if columns:
+            self._schedule_dynamic_rules(columns)
         return res
 
 
 class HrApplicant(models.Model):
     _inherit = ['hr.applicant', 'recruitment.custom.field.mixin']
+
+    def init(self):
+        super().init()
+        create_index(self.env.cr, make_index_name(self._table, JSON_VALUES_FIELD), self._table, [JSON_VALUES_FIELD], 'gin')
+
+
+class IrModelFields(models.Model):
+    _inherit = 'ir.model.fields'
+
+    def _instanciate_attrs(self, field_data):
+        attrs = super()._instanciate_attrs(field_data)
+        if (attrs and field_data['model'] == 'hr.applicant' and not field_data['store']
+                and CUSTOM_FIELD_PATTERN.fullmatch(field_data['name'])):
+            # custom field of a JSON template, read from and written to
+            # hr.applicant.custom_values
+            compute = functools.partial(_compute_json_value, fname=field_data['name'])
+            compute._depends = (JSON_VALUES_FIELD,)
+            attrs.update(
+                compute=compute,
+                inverse=_inverse_json_values,
+                search=functools.partial(_search_json_value, fname=field_data['name']),
+                readonly=False,
+            )
+        match = ORDINAL_FIELD_PATTERN.fullmatch(field_data['name'])
+        if attrs and field_data['model'] == 'hr.applicant' and field_data['store'] and match:
+            # position of the value of a dropdown template among its options
+            compute = functools.partial(_compute_ordinal, fname=field_data['name'])
+            compute._depends = (f'{match.group(1)}_value',)
+            attrs.update(compute=compute, readonly=True)
+        return attrs
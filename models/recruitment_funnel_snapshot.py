@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+from odoo.tools import SQL, create_unique_index
+
+# hr.applicant fields a funnel snapshot row is keyed on
+FUNNEL_FIELDS = ['company_id', 'job_id', 'stage_id', 'hire_decision', 'recruitment_phase', 'last_test', 'active']
+# snapshot key, matching the unique index used to upsert deltas
+FUNNEL_KEY = SQL(
+    "(COALESCE(company_id, 0)), (COALESCE(job_id, 0)), (COALESCE(stage_id, 0)), "
+    "(COALESCE(hire_decision, '')), (COALESCE(recruitment_phase, '')), (COALESCE(month, '1970-01-01'))"
+)
+
+
+class RecruitmentFunnelSnapshot(models.Model):
+    """Pre-aggregated applicant counts, kept up to date by hr.applicant"""
+    _name = 'recruitment.funnel.snapshot'
+    _description = 'Recruitment Funnel Snapshot'
+    _order = 'month desc, job_id, stage_id'
+    _rec_name = 'month'
+
+    company_id = fields.Many2one('res.company', 'Company', readonly=True)
+    job_id = fields.Many2one('hr.job', 'Job Position', readonly=True)
+    stage_id = fields.Many2one('hr.recruitment.stage', 'Stage', readonly=True)
+    hire_decision = fields.Selection(
+        selection=lambda self: self.env['hr.applicant']._fields['hire_decision'].selection,
+        string='Decision', readonly=True)
+    recruitment_phase = fields.Selection(
+        selection=lambda self: self.env['hr.applicant']._fields['recruitment_phase'].selection,
+        string='Phase', readonly=True)
+    month = fields.Date('Test Month', readonly=True, help='Month of the online test')
+    applicant_count = fields.Integer('Applicants', readonly=True, aggregator='sum')
+
+    def init(self):
+        create_unique_index(self.env.cr, 'recruitment_funnel_snapshot_key_uniq', self._table, [
+            'COALESCE(company_id, 0)', 'COALESCE(job_id, 0)', 'COALESCE(stage_id, 0)',
+            "COALESCE(hire_decision, '')", "COALESCE(recruitment_phase, '')", "COALESCE(month, '1970-01-01')",
+        ])
+
+    def _applicant_counts_query(self, where, sign=1):
+        """Return the SELECT aggregating hr_applicant rows matching ``where``"""
+        return SQL(
+            """
+            SELECT company_id, job_id, stage_id, hire_decision, recruitment_phase,
+                   date_trunc('month', last_test)::date, %(sign)s * count(*),
+                   %(uid)s, %(uid)s, NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+              FROM hr_applicant
+             WHERE active AND %(where)s
+          GROUP BY 1, 2, 3, 4, 5, 6
+            """,
+            sign=sign, uid=self.env.uid, where=where,
+        )
+
+    @api.model
+    def _apply_delta(self, applicants, sign):
+        """Add (``sign`` = 1) or remove (``sign`` = -1) ``applicants`` from the snapshot
+
+        Return the applied counts as ``(company_id, stage_id, hire_decision,
+        month, count)`` rows, the breakdown shown by the dashboard.
+        """
+        if not applicants.ids:
+            return []
+        applicants.flush_recordset(FUNNEL_FIELDS)
+        self.env.cr.execute(SQL(
+            """
+            WITH counts (company_id, job_id, stage_id, hire_decision, recruitment_phase, month,
+                         applicant_count, create_uid, write_uid, create_date, write_date) AS (
+                %(counts)s
+            ), upsert AS (
+                INSERT INTO recruitment_funnel_snapshot
+                       (company_id, job_id, stage_id, hire_decision, recruitment_phase, month,
+                        applicant_count, create_uid, write_uid, create_date, write_date)
+                SELECT * FROM counts
+                ON CONFLICT (%(key)s) DO UPDATE
+                   SET applicant_count = recruitment_funnel_snapshot.applicant_count + EXCLUDED.applicant_count,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+            )
+            SELECT company_id, stage_id, hire_decision, month, SUM(applicant_count)::int
+              FROM counts
+          GROUP BY 1, 2, 3, 4
+            """,
+            counts=self._applicant_counts_query(SQL("id = ANY(%s)", applicants.ids), sign),
+            key=FUNNEL_KEY,
+        ))
+        rows = self.env.cr.fetchall()
+        self.invalidate_model(['applicant_count'])
+        return rows
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole snapshot from hr_applicant"""
+        self.env['hr.applicant'].flush_model(FUNNEL_FIELDS)
+        # deltas of concurrent transactions wait for the rebuild to commit
+        self.env.cr.execute(SQL("LOCK TABLE recruitment_funnel_snapshot IN EXCLUSIVE MODE"))
+        self.env.cr.execute(SQL("DELETE FROM recruitment_funnel_snapshot"))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO recruitment_funnel_snapshot
+                   (company_id, job_id, stage_id, hire_decision, recruitment_phase, month,
+                    applicant_count, create_uid, write_uid, create_date, write_date)
+            %s
+            """,
+            self._applicant_counts_query(SQL("TRUE")),
+        ))
+        self.env.invalidate_all()
+        self.env['hr.applicant']._send_dashboard_reload()
+
+    @api.model
+    def _cron_rebuild(self):
+        self._rebuild()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import functools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import SUPERUSER_ID, api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# set to "0" to disable the collection of timings
+PERF_ENABLED_PARAM = 'peepl_hr_custom.perf_stats'
+# calls slower than this many milliseconds are logged, 0 to disable
+PERF_THRESHOLD_PARAM = 'peepl_hr_custom.perf_slow_threshold_ms'
+# seconds between two flushes of the samples of a worker
+PERF_FLUSH_INTERVAL = 60
+# samples kept per method between two flushes
+PERF_MAX_SAMPLES = 10000
+# days of statistics kept
+PERF_RETENTION_DAYS = 30
+
+# per database, the samples of each method and the start of their period
+_samples_lock = threading.Lock()
+_samples = defaultdict(lambda: defaultdict(list))
+_period_start = {}
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of sorted ``values``"""
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def _record_sample(env, name, duration, queries, records):
+    param = env['ir.config_parameter'].sudo().get_param
+    if param(PERF_ENABLED_PARAM, '1') == '0':
+        return
+    threshold = float(param(PERF_THRESHOLD_PARAM, 0) or 0)
+    if threshold and duration * 1000 > threshold:
+        _logger.warning("%s took %.0f ms (%s queries, %s records)", name, duration * 1000, queries, records)
+
+    db_name = env.registry.db_name
+    with _samples_lock:
+        db_samples = _samples[db_name]
+        if db_name not in _period_start:
+            _period_start[db_name] = (fields.Datetime.now(), time.monotonic())
+        samples = db_samples[name]
+        if len(samples) < PERF_MAX_SAMPLES:
+            samples.append((duration, queries, records))
+        period_start, started = _period_start[db_name]
+        if time.monotonic() - started < PERF_FLUSH_INTERVAL:
+            return
+        pending = _samples.pop(db_name)
+        _period_start[db_name] = (fields.Datetime.now(), time.monotonic())
+
+    try:
+        # on its own cursor: the stats survive a rollback of the request
+        with env.registry.cursor() as cr:
+            api.Environment(cr, SUPERUSER_ID, {})['recruitment.perf.stat']._store_samples(pending, period_start)
+    except Exception:
+        _logger.warning("Could not store recruitment performance statistics", exc_info=True)
+
+
+def profiled(method):
+    """Record wall time, SQL queries and records processed of each call of
+    the decorated model method into recruitment.perf.stat"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        duration = time.perf_counter() - start
+        name = f'{self._name}.{method.__name__}'
+        try:
+            _record_sample(self.env, name, duration, self.env.cr.sql_log_count - queries, len(self))
+        except Exception:
+            _logger.debug("Could not record timing of %s", name, exc_info=True)
+        return result
+    return wrapper
+
+
+class RecruitmentPerfStat(models.Model):
+    """Per-method timings of the custom field subsystem, one row per method,
+    worker and flush period"""
+    _name = 'recruitment.perf.stat'
+    _description = 'Recruitment Performance Statistic'
+    _order = 'period_end desc, name'
+
+    name = fields.Char('Method', required=True, readonly=True, index=True)
+    period_start = fields.Datetime('From', readonly=True)
+    period_end = fields.Datetime('To', readonly=True, index=True)
+    worker_pid = fields.Integer('Worker', readonly=True, aggregator=None)
+    call_count = fields.Integer('Calls', readonly=True)
+    total_ms = fields.Float('Total (ms)', readonly=True, digits=(16, 1))
+    # averages and percentiles of one period cannot be combined with those
+    # of others, totals can
+    avg_ms = fields.Float('Average (ms)', readonly=True, digits=(16, 2), aggregator=None)
+    p50_ms = fields.Float('P50 (ms)', readonly=True, digits=(16, 2), aggregator=None)
+    p95_ms = fields.Float('P95 (ms)', readonly=True, digits=(16, 2), aggregator=None)
+    p99_ms = fields.Float('P99 (ms)', readonly=True, digits=(16, 2), aggregator=None)
+    max_ms = fields.Float('Max (ms)', readonly=True, digits=(16, 2), aggregator='max')
+    query_count = fields.Integer('SQL Queries', readonly=True)
+    avg_queries = fields.Float('Queries per Call', readonly=True, digits=(16, 1), aggregator=None)
+    record_count = fields.Integer('Records Processed', readonly=True)
+
+    @api.model
+    def _store_samples(self, samples, period_start):
+        vals_list = []
+        for name, calls in samples.items():
+            if not calls:
+                continue
+            durations = sorted(duration * 1000 for duration, __, __ in calls)
+            queries = sum(count for __, count, __ in calls)
+            vals_list.append({
+                'name': name,
+                'period_start': period_start,
+                'period_end': fields.Datetime.now(),
+                'worker_pid': os.getpid(),
+                'call_count': len(calls),
+                'total_ms': sum(durations),
+                'avg_ms': sum(durations) / len(calls),
+                'p50_ms': _percentile(durations, 50),
+                'p95_ms': _percentile(durations, 95),
+                'p99_ms': _percentile(durations, 99),
+                'max_ms': durations[-1],
+                'query_count': queries,
+                'avg_queries': queries / len(calls),
+                'record_count': sum(records for __, __, records in calls),
+            })
+        return self.create(vals_list)
+
+    @api.autovacuum
+    def _gc_old_stats(self):
+        limit = fields.Datetime.now() - timedelta(days=PERF_RETENTION_DAYS)
+        self.search([('period_end', '<', limit)]).unlink()
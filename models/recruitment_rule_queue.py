@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import SQL, create_unique_index
+
+_logger = logging.getLogger(__name__)
+
+# set to "1" to evaluate auto-decision rules in the background
+DEFERRED_RULES_PARAM = 'peepl_hr_custom.deferred_rules'
+# applicants evaluated per transaction by the queue cron
+RULE_QUEUE_BATCH_SIZE = 1000
+# failing applicants are left aside after this many evaluations
+RULE_QUEUE_MAX_ATTEMPTS = 5
+# cursor precommit data flagging the queue cron as already triggered
+QUEUE_TRIGGERED_KEY = 'peepl_hr_custom.rule_queue_triggered'
+
+
+class RecruitmentRuleQueue(models.Model):
+    """Applicants whose auto-decision rules still have to be evaluated, one
+    row per applicant however many times it was written"""
+    _name = 'recruitment.rule.queue'
+    _description = 'Recruitment Rule Evaluation Queue'
+    _order = 'id'
+    _rec_name = 'applicant_id'
+    _log_access = False
+
+    applicant_id = fields.Many2one('hr.applicant', 'Applicant', required=True, readonly=True, ondelete='cascade')
+    enqueue_date = fields.Datetime('Queued on', readonly=True)
+    attempts = fields.Integer('Attempts', readonly=True)
+    last_error = fields.Text('Last Error', readonly=True)
+
+    def init(self):
+        create_unique_index(self.env.cr, 'recruitment_rule_queue_applicant_uniq', self._table, ['applicant_id'])
+
+    @api.model
+    def _enqueue(self, applicants):
+        """Queue ``applicants`` and wake the queue cron up"""
+        if not applicants.ids:
+            return
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO recruitment_rule_queue (applicant_id, enqueue_date, attempts)
+            SELECT unnest(%(ids)s::int[]), NOW() AT TIME ZONE 'UTC', 0
+            ON CONFLICT (applicant_id) DO UPDATE
+               SET attempts = 0, last_error = NULL
+            """,
+            ids=applicants.ids,
+        ))
+        if not self.env.cr.precommit.data.get(QUEUE_TRIGGERED_KEY):
+            self.env.cr.precommit.data[QUEUE_TRIGGERED_KEY] = True
+            self.env.ref('peepl_hr_custom.ir_cron_process_rule_queue').sudo()._trigger()
+
+    def _evaluate(self, applicant_ids, queue_ids):
+        """Apply the rules of the applicants and dequeue them
+
+        :return: the error raised by the evaluation, None on success
+        """
+        try:
+            with self.env.cr.savepoint():
+                self.env['hr.applicant'].sudo().browse(applicant_ids).exists()._apply_dynamic_rules()
+        except Exception as e:
+            self.env.invalidate_all()
+            return e
+        self.env.cr.execute(SQL("DELETE FROM recruitment_rule_queue WHERE id = ANY(%s)", queue_ids))
+        return None
+
+    def _process(self, applicant_ids, queue_ids):
+        """Evaluate a batch, or each applicant on its own if the batch fails"""
+        if len(queue_ids) > 1 and not self._evaluate(applicant_ids, queue_ids):
+            return
+        for applicant_id, queue_id in zip(applicant_ids, queue_ids):
+            error = self._evaluate([applicant_id], [queue_id])
+            if error:
+                _logger.warning("Rule evaluation of applicant %s failed: %s", applicant_id, error)
+                self.env.cr.execute(SQL(
+                    "UPDATE recruitment_rule_queue SET attempts = attempts + 1, last_error = %s WHERE id = %s",
+                    str(error), queue_id,
+                ))
+
+    @api.model
+    def _get_backlog(self):
+        """Return the pending and failed counts and the age of the oldest pending row"""
+        self.env.cr.execute(SQL(
+            """
+            SELECT count(*) FILTER (WHERE attempts < %(max)s),
+                   count(*) FILTER (WHERE attempts >= %(max)s),
+                   EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC') - min(enqueue_date) FILTER (WHERE attempts < %(max)s))
+              FROM recruitment_rule_queue
+            """,
+            max=RULE_QUEUE_MAX_ATTEMPTS,
+        ))
+        pending, failed, age = self.env.cr.fetchone()
+        return {'pending': pending, 'failed': failed, 'oldest_seconds': age or 0}
+
+    @api.model
+    def _cron_process_queue(self, batch_size=RULE_QUEUE_BATCH_SIZE):
+        """Drain the queue in batches of ``batch_size``, committing after each"""
+        processed = last_id = 0
+        while True:
+            # failed rows are retried on the next run, not in this loop
+            self.env.cr.execute(SQL(
+                """
+                SELECT id, applicant_id
+                  FROM recruitment_rule_queue
+                 WHERE attempts < %s AND id > %s
+              ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+                """,
+                RULE_QUEUE_MAX_ATTEMPTS, last_id, batch_size,
+            ))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            queue_ids, applicant_ids = zip(*rows)
+            last_id = queue_ids[-1]
+            self._process(list(applicant_ids), list(queue_ids))
+            self.env.cr.commit()
+            processed += len(rows)
+        backlog = self._get_backlog()
+        _logger.info(
+            "Evaluated recruitment rules of %s queued applicant(s), %s pending, %s failed, oldest %.0fs",
+            processed, backlog['pending'], backlog['failed'], backlog['oldest_seconds'],
+        )
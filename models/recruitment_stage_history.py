@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+from odoo.tools import SQL, create_index
+
+
+class RecruitmentStageHistory(models.Model):
+    """Stage and phase changes of the applicants, one row per change,
+    read by recruitment.throughput.report"""
+    _name = 'recruitment.stage.history'
+    _description = 'Recruitment Stage History'
+    _order = 'applicant_id, date, id'
+    _log_access = False
+
+    applicant_id = fields.Many2one('hr.applicant', 'Applicant', required=True, readonly=True, ondelete='cascade')
+    stage_id = fields.Many2one('hr.recruitment.stage', 'Stage', readonly=True, ondelete='set null')
+    recruitment_phase = fields.Selection(
+        selection=lambda self: self.env['hr.applicant']._fields['recruitment_phase'].selection,
+        string='Phase', readonly=True)
+    date = fields.Datetime('Date', required=True, readonly=True)
+
+    def init(self):
+        create_index(self.env.cr, 'recruitment_stage_history_applicant_date_index', self._table,
+                     ['applicant_id', 'date', 'id'])
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.rowcount:
+            # earlier changes are unknown: start from the current stages
+            self.env.cr.execute(SQL(
+                """
+                INSERT INTO %s (applicant_id, stage_id, recruitment_phase, date)
+                SELECT id, stage_id, recruitment_phase, COALESCE(date_last_stage_update, create_date, NOW() AT TIME ZONE 'UTC')
+                  FROM hr_applicant
+                """,
+                SQL.identifier(self._table),
+            ))
+
+    @api.model
+    def _record(self, applicants):
+        """Add a row for each of ``applicants`` whose stage or phase differs
+        from its last recorded one"""
+        if not applicants.ids:
+            return
+        applicants.flush_recordset(['stage_id', 'recruitment_phase'])
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(table)s (applicant_id, stage_id, recruitment_phase, date)
+            SELECT a.id, a.stage_id, a.recruitment_phase, NOW() AT TIME ZONE 'UTC'
+              FROM hr_applicant a
+         LEFT JOIN LATERAL (
+                    SELECT h.stage_id, h.recruitment_phase
+                      FROM %(table)s h
+                     WHERE h.applicant_id = a.id
+                  ORDER BY h.date DESC, h.id DESC
+                     LIMIT 1
+                   ) previous ON TRUE
+             WHERE a.id = ANY(%(ids)s)
+               AND (a.stage_id, a.recruitment_phase) IS DISTINCT FROM (previous.stage_id, previous.recruitment_phase)
+            """,
+            table=SQL.identifier(self._table),
+            ids=applicants.ids,
+        ))
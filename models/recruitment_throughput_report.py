@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields, models, tools
+from odoo.tools import SQL
+
+
+class RecruitmentThroughputReport(models.Model):
+    """Funnel throughput, one row per stage or phase change of an applicant,
+    computed by a view over recruitment.stage.history
+
+    Consecutive changes within the same stage make up one stage visit: the
+    stage measures are set on the row the visit starts on, the phase ones on
+    the rows entering a phase. Measures stay exact whatever the grouping:
+    counts are sums of 0/1 columns, rates are averages of 0/100 columns
+    (NULL outside of the rows they apply to) and the time in stage is
+    aggregated by its median.
+    """
+    _name = 'recruitment.throughput.report'
+    _description = 'Recruitment Throughput Analysis'
+    _auto = False
+    _order = 'date_in desc'
+    _rec_name = 'applicant_id'
+
+    applicant_id = fields.Many2one('hr.applicant', 'Applicant', readonly=True)
+    company_id = fields.Many2one('res.company', 'Company', readonly=True)
+    job_id = fields.Many2one('hr.job', 'Job Position', readonly=True)
+    cohort_date = fields.Date('Test Date', readonly=True, help='Date of the online test, the cohort of the applicant')
+    stage_id = fields.Many2one('hr.recruitment.stage', 'Stage', readonly=True)
+    next_stage_id = fields.Many2one('hr.recruitment.stage', 'Next Stage', readonly=True)
+    recruitment_phase = fields.Selection(
+        selection=lambda self: self.env['hr.applicant']._fields['recruitment_phase'].selection,
+        string='Phase', readonly=True)
+    date_in = fields.Datetime('Entered Stage', readonly=True)
+    date_out = fields.Datetime('Left Stage', readonly=True)
+    applicant_count = fields.Integer('Applicants', readonly=True, aggregator='sum')
+    stage_entry_count = fields.Integer('Stage Entries', readonly=True, aggregator='sum')
+    days_in_stage = fields.Float('Average Days in Stage', readonly=True, digits=(16, 1), aggregator='avg')
+    median_days = fields.Float('Median Days in Stage', readonly=True, digits=(16, 1), aggregator='median')
+    stage_conversion_rate = fields.Float('Stage Conversion (%)', readonly=True, digits=(16, 1), aggregator='avg',
+                                         help='Share of the ended stage visits followed by a later stage; '
+                                              'applicants still in the stage are not counted')
+    phase_entry_count = fields.Integer('Phase Entries', readonly=True, aggregator='sum')
+    phase_converted_count = fields.Integer('Phase Conversions', readonly=True, aggregator='sum')
+    phase_conversion_rate = fields.Float('Phase Conversion (%)', readonly=True, digits=(16, 1), aggregator='avg',
+                                         help='Share of the applicants entering the phase who later reached a further one')
+
+    def _query(self):
+        phases = [code for code, __ in self.env['hr.applicant']._fields['recruitment_phase'].selection]
+        return SQL(
+            """
+            WITH changes AS (
+                SELECT h.id, h.applicant_id, h.stage_id, h.recruitment_phase, h.date,
+                       ROW_NUMBER() OVER w AS position,
+                       LAG(h.id) OVER w IS NULL
+                       OR h.stage_id IS DISTINCT FROM LAG(h.stage_id) OVER w AS stage_entry,
+                       LAG(h.recruitment_phase) OVER w AS previous_phase,
+                       array_position(%(phases)s::varchar[], h.recruitment_phase::varchar) AS phase_rank,
+                       MAX(array_position(%(phases)s::varchar[], h.recruitment_phase::varchar))
+                           OVER (w ROWS BETWEEN 1 FOLLOWING AND UNBOUNDED FOLLOWING) AS later_phase_rank
+                  FROM recruitment_stage_history h
+                WINDOW w AS (PARTITION BY h.applicant_id ORDER BY h.date, h.id)
+            ), islands AS (
+                -- consecutive changes within one stage share their visit number
+                SELECT c.*,
+                       SUM(CASE WHEN c.stage_entry THEN 1 ELSE 0 END)
+                           OVER (PARTITION BY c.applicant_id ORDER BY c.date, c.id) AS visit
+                  FROM changes c
+            ), visits AS (
+                SELECT applicant_id, visit, MIN(date) AS date_in, MIN(stage_id) AS stage_id
+                  FROM islands
+              GROUP BY applicant_id, visit
+            ), stays AS (
+                SELECT v.applicant_id, v.visit, v.date_in,
+                       LEAD(v.date_in) OVER w AS date_out,
+                       LEAD(v.stage_id) OVER w AS next_stage_id
+                  FROM visits v
+                WINDOW w AS (PARTITION BY v.applicant_id ORDER BY v.visit)
+            ), entries AS (
+                SELECT i.*, st.date_in, st.date_out, st.next_stage_id,
+                       i.recruitment_phase IS NOT NULL
+                       AND i.recruitment_phase IS DISTINCT FROM i.previous_phase AS phase_entry,
+                       COALESCE(i.later_phase_rank > i.phase_rank, FALSE) AS phase_converted,
+                       CASE WHEN i.stage_entry THEN EXTRACT(EPOCH FROM st.date_out - st.date_in) / 86400 END AS days
+                  FROM islands i
+                  JOIN stays st ON st.applicant_id = i.applicant_id AND st.visit = i.visit
+            )
+            SELECT e.id, e.applicant_id, a.company_id, a.job_id, a.last_test AS cohort_date,
+                   e.stage_id, e.next_stage_id, e.recruitment_phase,
+                   e.date_in, e.date_out,
+                   CASE WHEN e.position = 1 THEN 1 ELSE 0 END AS applicant_count,
+                   CASE WHEN e.stage_entry THEN 1 ELSE 0 END AS stage_entry_count,
+                   e.days AS days_in_stage,
+                   e.days AS median_days,
+                   CASE WHEN e.stage_entry AND e.date_out IS NOT NULL THEN
+                       CASE WHEN (ns.sequence, ns.id) > (s.sequence, s.id) THEN 100 ELSE 0 END
+                   END AS stage_conversion_rate,
+                   CASE WHEN e.phase_entry THEN 1 ELSE 0 END AS phase_entry_count,
+                   CASE WHEN e.phase_entry AND e.phase_converted THEN 1 ELSE 0 END AS phase_converted_count,
+                   CASE WHEN e.phase_entry THEN CASE WHEN e.phase_converted THEN 100 ELSE 0 END END AS phase_conversion_rate
+              FROM entries e
+              JOIN hr_applicant a ON a.id = e.applicant_id
+         LEFT JOIN hr_recruitment_stage s ON s.id = e.stage_id
+         LEFT JOIN hr_recruitment_stage ns ON ns.id = e.next_stage_id
+             WHERE a.active
+            """,
+            phases=phases,
+        )
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL("CREATE OR REPLACE VIEW %s AS (%s)", SQL.identifier(self._table), self._query()))
+
+    def _read_group_select(self, aggregate_spec, query):
+        # median is not a standard aggregate of read_group
+        fname, __, func = aggregate_spec.partition(':')
+        if func == 'median':
+            return SQL(
+                "percentile_cont(0.5) WITHIN GROUP (ORDER BY %s)",
+                self._field_to_sql(query.table, fname, query),
+            )
+        return super()._read_group_select(aggregate_spec, query)
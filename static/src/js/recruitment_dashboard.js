@@ -1,15 +1,26 @@
 /** @odoo-module **/
 
-import { Component, useState, onWillStart, onMounted, useRef } from "@odoo/owl";
+import { Component, useState, onWillStart, onMounted, onWillUnmount, useRef } from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
 import { loadJS } from "@web/core/assets";
+import { rpc } from "@web/core/network/rpc";
+import { browser } from "@web/core/browser/browser";
+import { debounce } from "@web/core/utils/timing";
+import { user } from "@web/core/user";
+
+const DASHBOARD_CHANNEL = "peepl_hr_custom_dashboard";
+const DASHBOARD_DELTA = "peepl_hr_custom/dashboard_delta";
+const DASHBOARD_RELOAD = "peepl_hr_custom/dashboard_reload";
 
 class RecruitmentDashboard extends Component {
     static template = "peepl_hr_custom.RecruitmentDashboard";
 
     setup() {
         this.orm = useService("orm");
+        this.busService = useService("bus_service");
+        this.onDashboardDelta = (payload) => this.applyDashboardDelta(payload);
+        this.onDashboardReload = () => this.loadData();
         this.phaseChartRef = useRef("phaseChart");
         this.statusChartRef = useRef("statusChart");
         this.phaseColors = [
@@ -19,14 +30,20 @@ class RecruitmentDashboard extends Component {
         this.statusColors = [
             '#17a2b8', '#28a745', '#ffc107', '#dc3545'
         ];
+        this.candidateFields = [];
+        this.statusByCode = {};
+        this.phaseByCode = {};
+        this.candidatesRequestId = 0;
+        this.debouncedFilterCandidates = debounce(() => this.filterCandidates(), 300);
         this.state = useState({
             loading: true,
             stats: { total: 0, assessed: 0, onProgress: 0, failed: 0 },
             phaseData: [],
             statusData: [],
-            recentCandidates: [],
-            filteredCandidates: [],
+            months: [],
+            candidates: [],
             customFields: [],
+            statuses: [],
             searchText: '',
             sortField: '',
             sortDirection: 'asc',
@@ -37,43 +54,55 @@ class RecruitmentDashboard extends Component {
         onWillStart(async () => {
             await loadJS("/web/static/lib/Chart/Chart.js");
             await this.loadData();
+            // counts are then kept up to date by the server
+            this.busService.addChannel(DASHBOARD_CHANNEL);
+            this.busService.subscribe(DASHBOARD_DELTA, this.onDashboardDelta);
+            this.busService.subscribe(DASHBOARD_RELOAD, this.onDashboardReload);
         });
 
         onMounted(() => {
             this.renderCharts();
         });
+
+        onWillUnmount(() => {
+            this.busService.unsubscribe(DASHBOARD_DELTA, this.onDashboardDelta);
+            this.busService.unsubscribe(DASHBOARD_RELOAD, this.onDashboardReload);
+            this.busService.deleteChannel(DASHBOARD_CHANNEL);
+        });
     }
 
     async loadData() {
         this.state.loading = true;
         try {
-            // Get custom fields
-            const customFields = await this.orm.searchRead(
-                "recruitment.custom.field",
-                [["active", "=", true]],
-                ["name", "field_type"],
-                { order: "sequence" }
-            );
+            // Get custom fields, server-side aggregates and status/phase labels
+            const [customFields, dashboard, config] = await Promise.all([
+                this.orm.searchRead(
+                    "recruitment.custom.field",
+                    [["active", "=", true]],
+                    ["name", "field_type"],
+                    { order: "sequence" }
+                ),
+                this.orm.call("hr.applicant", "get_dashboard_data", []),
+                rpc("/peepl_hr_custom/config"),
+            ]);
+            this.statusByCode = Object.fromEntries(config.statuses.map(s => [s.code, s]));
+            this.phaseByCode = Object.fromEntries(config.phases.map(p => [p.code, p]));
+            this.state.statuses = config.statuses.filter(s => s.active);
+            this.state.stats = dashboard.stats;
+            this.state.phaseData = dashboard.phaseData;
+            this.state.statusData = dashboard.statusData;
+            this.state.months = dashboard.months;
             
             // Build field list dynamically
             const baseFields = ["partner_name", "email_from", "job_id", "stage_id", "recruitment_phase", "hire_decision", 
                  "applicant_notes", "create_date", "last_test"];
             
             const customFieldNames = customFields.map(f => `x_field${f.id}_value`);
-            const allFields = [...baseFields, ...customFieldNames];
+            this.candidateFields = [...baseFields, ...customFieldNames];
             
             this.state.customFields = customFields;
 
-            const candidates = await this.orm.searchRead(
-                "hr.applicant",
-                [],
-                allFields
-            );
-
-            this.updateStats(candidates);
-            this.updateChartData(candidates);
-            this.state.recentCandidates = candidates;
-            this.filterCandidates();
+            await this.filterCandidates();
         } catch (error) {
             console.error("Error loading dashboard data:", error);
         } finally {
@@ -83,80 +112,59 @@ class RecruitmentDashboard extends Component {
 
     getDomainFilters() {
         let domain = [];
+        if (this.state.searchText) {
+            domain.push("|",
+                ["partner_name", "ilike", this.state.searchText],
+                ["email_from", "ilike", this.state.searchText]
+            );
+        }
         if (this.state.filters.phase !== 'all') {
-            domain.push(["recruitment_phase", "=", this.state.filters.phase]);
+            domain.push(["stage_id", "=", parseInt(this.state.filters.phase)]);
         }
         if (this.state.filters.decision !== 'all') {
             domain.push(["hire_decision", "=", this.state.filters.decision]);
         }
         if (this.state.filters.month !== 'all') {
-            const [year, month] = this.state.filters.month.split('-');
-            const startDate = `${year}-${month}-01`;
-            const endDate = new Date(year, month, 0).toISOString().split('T')[0];
+            const [year, month] = this.state.filters.month.split('-').map(Number);
+            const startDate = `${year}-${String(month).padStart(2, '0')}-01`;
+            const endDate = month === 12 ? `${year + 1}-01-01` : `${year}-${String(month + 1).padStart(2, '0')}-01`;
             domain.push(["last_test", ">=", startDate]);
-            domain.push(["last_test", "<=", endDate]);
+            domain.push(["last_test", "<", endDate]);
         }
         return domain;
     }
 
-    updateStats(candidates) {
-        this.state.stats = {
-            total: candidates.length,
-            assessed: candidates.filter(c => c.last_test).length,
-            onProgress: candidates.filter(c => c.hire_decision !== 'do_not_pursue').length,
-            failed: candidates.filter(c => c.hire_decision === 'do_not_pursue').length
-        };
+    getOrder() {
+        return this.state.sortField ? `${this.state.sortField} ${this.state.sortDirection}, id` : undefined;
+    }
+
+    async loadCandidates(count = false) {
+        const requestId = ++this.candidatesRequestId;
+        const { currentPage, itemsPerPage } = this.state.pagination;
+        const domain = this.getDomainFilters();
+        const [candidates, total] = await Promise.all([
+            this.orm.searchRead("hr.applicant", domain, this.candidateFields, {
+                order: this.getOrder(),
+                limit: itemsPerPage,
+                offset: (currentPage - 1) * itemsPerPage,
+            }),
+            count ? this.orm.searchCount("hr.applicant", domain) : this.state.pagination.totalItems,
+        ]);
+        // ignore responses of requests superseded while in flight
+        if (requestId !== this.candidatesRequestId) {
+            return;
+        }
+        this.state.candidates = candidates;
+        this.state.pagination.totalItems = total;
     }
 
     filterCandidates() {
-        let filtered = this.state.recentCandidates;
-        
-        if (this.state.searchText) {
-            const search = this.state.searchText.toLowerCase();
-            filtered = filtered.filter(c => 
-                (c.partner_name && c.partner_name.toLowerCase().includes(search)) ||
-                (c.email_from && c.email_from.toLowerCase().includes(search))
-            );
-        }
-        
-        if (this.state.filters.phase !== 'all') {
-            const phaseId = parseInt(this.state.filters.phase);
-            filtered = filtered.filter(c => c.stage_id && c.stage_id[0] === phaseId);
-        }
-        
-        if (this.state.filters.decision !== 'all') {
-            filtered = filtered.filter(c => c.hire_decision === this.state.filters.decision);
-        }
-        
-        if (this.state.filters.month !== 'all') {
-            const [year, month] = this.state.filters.month.split('-');
-            filtered = filtered.filter(c => {
-                if (!c.last_test) return false;
-                const testDate = new Date(c.last_test);
-                return testDate.getFullYear() === parseInt(year) && testDate.getMonth() + 1 === parseInt(month);
-            });
-        }
-        
-        this.state.filteredCandidates = filtered;
-        this.state.pagination.totalItems = filtered.length;
         this.state.pagination.currentPage = 1;
-        
-        if (this.state.sortField) {
-            this.state.filteredCandidates.sort((a, b) => {
-                let aVal = a[this.state.sortField] || '';
-                let bVal = b[this.state.sortField] || '';
-                
-                if (aVal < bVal) return this.state.sortDirection === 'asc' ? -1 : 1;
-                if (aVal > bVal) return this.state.sortDirection === 'asc' ? 1 : -1;
-                return 0;
-            });
-        }
+        return this.loadCandidates(true);
     }
 
     getPaginatedCandidates() {
-        const start = (this.state.pagination.currentPage - 1) * this.state.pagination.itemsPerPage;
-        const end = start + this.state.pagination.itemsPerPage;
-        return this.state.filteredCandidates.slice(start, end);
+        return this.state.candidates;
     }
 
     getTotalPages() {
@@ -164,8 +172,11 @@ class RecruitmentDashboard extends Component {
     }
 
     getPageNumbers() {
+        // a window of at most 5 pages around the current one
         const totalPages = this.getTotalPages();
-        return Array.from({length: totalPages}, (_, i) => i + 1);
+        const first = Math.max(1, Math.min(this.state.pagination.currentPage - 2, totalPages - 4));
+        const last = Math.min(totalPages, first + 4);
+        return Array.from({length: last - first + 1}, (_, i) => first + i);
     }
 
     getBeiValue(bei) {
@@ -177,24 +188,11 @@ class RecruitmentDashboard extends Component {
     }
 
     getPhaseName(phase) {
-        const phases = {
-            'online_failed': 'Online Failed',
-            'online_passed': 'Online Passed',
-            'ai_interview': 'AI Interview',
-            'user_interview': 'User Interview',
-            'psc_interview': 'PSC Interview'
-        };
-        return phases[phase] || phase || '-';
+        return this.phaseByCode[phase]?.name || phase || '-';
     }
 
     getDecisionName(decision) {
-        const decisions = {
-            'on_progress': 'On Progress',
-            'recommended': 'Recommended',
-            'offer_made': 'Offer Made',
-            'do_not_pursue': 'Do Not Pursue'
-        };
-        return decisions[decision] || decision || '-';
+        return this.statusByCode[decision]?.name || decision || '-';
     }
 
     getStatusBadgeClass(status) {
@@ -214,31 +212,61 @@ class RecruitmentDashboard extends Component {
         return div.textContent || div.innerText || '-';
     }
 
-    updateChartData(candidates) {
-        const phaseCount = {};
-        const statusCount = {
-            'on_progress': { name: 'On Progress', count: 0 },
-            'recommended': { name: 'Recommended', count: 0 },
-            'offer_made': { name: 'Offer Made', count: 0 },
-            'do_not_pursue': { name: 'Do Not Pursue', count: 0 }
-        };
-
-        candidates.forEach(c => {
-            if (c.stage_id && c.stage_id[1]) {
-                const stageName = c.stage_id[1];
-                if (!phaseCount[stageName]) {
-                    phaseCount[stageName] = { name: stageName, count: 0 };
+    applyDashboardDelta({ company_id, deltas }) {
+        const companyIds = user.context.allowed_company_ids || [];
+        if (company_id && !companyIds.includes(company_id)) {
+            return;
+        }
+        const stats = this.state.stats;
+        for (const delta of deltas) {
+            stats.total += delta.count;
+            if (delta.hire_decision === 'do_not_pursue') {
+                stats.failed += delta.count;
+            } else {
+                stats.onProgress += delta.count;
+            }
+            if (delta.month) {
+                stats.assessed += delta.count;
+                if (delta.count > 0 && !this.state.months.includes(delta.month)) {
+                    this.state.months = [...this.state.months, delta.month].sort().reverse();
                 }
-                phaseCount[stageName].count++;
             }
-            
-            if (c.hire_decision && statusCount[c.hire_decision]) {
-                statusCount[c.hire_decision].count++;
+            if (delta.stage_id) {
+                this.addCount(this.state.phaseData, 'id', delta.stage_id, delta.count,
+                    () => ({ id: delta.stage_id, name: delta.stage_name }));
             }
-        });
+            if (delta.hire_decision) {
+                this.addCount(this.state.statusData, 'code', delta.hire_decision, delta.count,
+                    () => ({ code: delta.hire_decision, name: this.getDecisionName(delta.hire_decision) }));
+            }
+        }
+        this.updateChart('phaseChart', this.state.phaseData, this.phaseColors);
+        this.updateChart('statusChart', this.state.statusData, this.statusColors);
+    }
 
-        this.state.phaseData = Object.values(phaseCount).filter(p => p.count > 0);
-        this.state.statusData = Object.values(statusCount).filter(s => s.count > 0);
+    addCount(data, key, value, count, makeEntry) {
+        const index = data.findIndex(d => d[key] === value);
+        if (index < 0) {
+            if (count > 0) {
+                data.push({ ...makeEntry(), count });
+            }
+        } else if (data[index].count + count > 0) {
+            data[index].count += count;
+        } else {
+            data.splice(index, 1);
+        }
+    }
+
+    updateChart(refName, data, colors) {
+        const chart = this[refName + 'Instance'];
+        if (!chart) {
+            this.renderPieChart(refName, data, colors);
+            return;
+        }
+        // in place, the chart animates from its current values
+        chart.data.labels = data.map(d => d.name);
+        chart.data.datasets[0].data = data.map(d => d.count);
+        chart.update();
     }
 
     renderCharts() {
@@ -336,43 +364,27 @@ class RecruitmentDashboard extends Component {
     }
 
     getPhaseCodeFromName(name) {
-        const candidates = this.state.recentCandidates;
-        for (const c of candidates) {
-            if (c.stage_id && c.stage_id[1] === name) {
-                return c.stage_id[0];
-            }
-        }
-        return 'all';
+        return this.getPhaseIdByName(name);
     }
 
     getPhaseIdByName(name) {
-        const candidates = this.state.recentCandidates;
-        for (const c of candidates) {
-            if (c.stage_id && c.stage_id[1] === name) {
-                return c.stage_id[0];
-            }
-        }
-        return 'all';
+        const phase = this.state.phaseData.find(p => p.name === name);
+        return phase ? phase.id : 'all';
     }
 
     getDecisionCodeFromName(name) {
-        const decisions = {
-            'On Progress': 'on_progress',
-            'Recommended': 'recommended',
-            'Offer Made': 'offer_made',
-            'Do Not Pursue': 'do_not_pursue'
-        };
-        return decisions[name] || 'all';
+        const status = this.state.statusData.find(s => s.name === name);
+        return status ? status.code : 'all';
     }
 
     onItemsPerPageChange(ev) {
         this.state.pagination.itemsPerPage = parseInt(ev.target.value);
-        this.state.pagination.currentPage = 1;
+        this.filterCandidates();
     }
 
     onSearchInput(ev) {
         this.state.searchText = ev.target.value;
-        this.filterCandidates();
+        this.debouncedFilterCandidates();
     }
 
     clearAllFilters() {
@@ -392,7 +404,6 @@ class RecruitmentDashboard extends Component {
 
     onPhaseFilterChange(ev) {
         this.state.filters.phase = ev.target.value;
-        this.state.pagination.currentPage = 1;
         this.filterCandidates();
     }
 
@@ -412,15 +423,7 @@ class RecruitmentDashboard extends Component {
     }
 
     getAvailableMonths() {
-        const months = new Set();
-        this.state.recentCandidates.forEach(c => {
-            if (c.last_test) {
-                const date = new Date(c.last_test);
-                const yearMonth = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
-                months.add(yearMonth);
-            }
-        });
-        return Array.from(months).sort().reverse();
+        return this.state.months;
     }
 
     getMonthName(yearMonth) {
@@ -439,21 +442,33 @@ class RecruitmentDashboard extends Component {
         this.filterCandidates();
     }
 
+    exportCandidates(ev) {
+        // streamed by the server, in the current filters
+        const params = new URLSearchParams({
+            file_format: ev.currentTarget.dataset.format,
+            domain: JSON.stringify(this.getDomainFilters()),
+        });
+        browser.location.assign(`/peepl_hr_custom/applicants/export?${params}`);
+    }
+
     goToPreviousPage() {
         if (this.state.pagination.currentPage > 1) {
             this.state.pagination.currentPage--;
+            this.loadCandidates();
         }
     }
 
     goToNextPage() {
         if (this.state.pagination.currentPage < this.getTotalPages()) {
             this.state.pagination.currentPage++;
+            this.loadCandidates();
         }
     }
 
     goToPage(ev) {
         const page = parseInt(ev.target.dataset.page);
         this.state.pagination.currentPage = page;
+        this.loadCandidates();
     }
 }
 
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import test_benchmark_custom_fields
+from . import test_custom_field_json
+from . import test_custom_field_migration
+from . import test_custom_field_rules
+from . import test_funnel_snapshot
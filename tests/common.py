@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase
+
+
+class RecruitmentCase(TransactionCase):
+
+    @classmethod
+    def _link_candidates(cls, vals_list):
+        """Create the candidate of each applicant of ``vals_list`` when the
+        hr.candidate model exists, and return ``vals_list``"""
+        if 'hr.candidate' in cls.env:
+            candidates = cls.env['hr.candidate'].create([
+                {'partner_name': vals['partner_name'], 'email_from': vals['email_from']}
+                for vals in vals_list
+            ])
+            for vals, candidate in zip(vals_list, candidates):
+                vals['candidate_id'] = candidate.id
+        return vals_list
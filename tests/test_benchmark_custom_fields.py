@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Performance benchmark of the custom field subsystem
+
+Not part of the standard test run, select it explicitly::
+
+    odoo-bin -d bench -i peepl_hr_custom --test-tags peepl_hr_benchmark --stop-after-init
+
+Volumes are read from the environment, comma separated values are swept:
+
+- ``PEEPL_HR_BENCH_APPLICANTS``: applicants seeded per scenario (default ``1000``)
+- ``PEEPL_HR_BENCH_TEMPLATES``: templates created per scenario (default ``5``)
+- ``PEEPL_HR_BENCH_OUTPUT``: file receiving the JSON results (default: log only)
+
+e.g. ``PEEPL_HR_BENCH_APPLICANTS=10000,100000 PEEPL_HR_BENCH_TEMPLATES=5,20,50``.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+from .common import RecruitmentCase
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+VIEW_REPEAT = 20
+SELECTION_OPTIONS = ['A', 'B', 'C', 'D']
+# field type, operator and threshold of the generated templates, cycled
+TEMPLATE_SPECS = [
+    ('integer', '>=', '60'),
+    ('float', 'between', '2.5,7.5'),
+    ('char', 'in', 'pass,strong'),
+    ('selection', '>=', 'C'),
+    ('boolean', '=', 'True'),
+    ('date', False, False),
+    ('integer', '<', '30'),
+    ('selection', 'not in', 'A'),
+    ('char', '=', 'pass'),
+    ('text', False, False),
+]
+
+
+def _volumes(name, default):
+    return [int(value) for value in os.environ.get(name, default).split(',') if value.strip()]
+
+
+@tagged('post_install', '-at_install', '-standard', 'peepl_hr_benchmark')
+class TestCustomFieldBenchmark(RecruitmentCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, mail_create_nolog=True))
+        cls.job = cls.env['hr.job'].create({'name': 'Benchmark Position'})
+        cls.recommended = cls.env.ref('peepl_hr_custom.status_recommended')
+        cls.do_not_pursue = cls.env.ref('peepl_hr_custom.status_do_not_pursue')
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        output = json.dumps({'benchmark': 'peepl_hr_custom', 'scenarios': cls.results}, indent=2)
+        _logger.info("Custom field benchmark results:\n%s", output)
+        path = os.environ.get('PEEPL_HR_BENCH_OUTPUT')
+        if path:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(output)
+        super().tearDownClass()
+
+    @contextmanager
+    def _measure(self, metrics, name, records=1):
+        """Store the duration and SQL queries of the block in ``metrics[name]``"""
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        duration = time.perf_counter() - start
+        query_count = cr.sql_log_count - queries
+        metrics[name] = {
+            'seconds': round(duration, 4),
+            'queries': query_count,
+            'records': records,
+            'records_per_second': round(records / duration, 1) if duration else None,
+            'queries_per_record': round(query_count / records, 2) if records else None,
+        }
+
+    def _template_vals(self, count):
+        vals_list = []
+        for index in range(count):
+            field_type, op, threshold = TEMPLATE_SPECS[index % len(TEMPLATE_SPECS)]
+            vals = {
+                'name': f'Benchmark {field_type} {index}',
+                'field_type': field_type,
+                'sequence': index,
+            }
+            if field_type == 'selection':
+                vals['selection_values'] = '\n'.join(SELECTION_OPTIONS)
+            if op:
+                vals.update({
+                    'validation_active': True,
+                    'validation_operator': op,
+                    'validation_value': threshold,
+                    'target_decision': self.recommended.id,
+                    'default_decision': self.do_not_pursue.id,
+                })
+            vals_list.append(vals)
+        return vals_list
+
+    def _custom_value(self, field_type, index):
+        if field_type == 'integer':
+            return index % 100
+        if field_type == 'float':
+            return (index % 100) / 10
+        if field_type in ('char', 'text'):
+            return ('pass', 'fail', 'strong')[index % 3]
+        if field_type == 'selection':
+            return SELECTION_OPTIONS[index % len(SELECTION_OPTIONS)]
+        if field_type == 'boolean':
+            return bool(index % 2)
+        if field_type == 'date':
+            return date(2024, 1, 1) + timedelta(days=index % 365)
+        return False
+
+    def _applicant_vals(self, templates, start, stop):
+        vals_list = [{
+            'partner_name': f'Benchmark Applicant {index}',
+            'email_from': f'applicant{index}@benchmark.example.com',
+            'job_id': self.job.id,
+            **{
+                template._column_name(): self._custom_value(template.field_type, index + template.id)
+                for template in templates
+            },
+        } for index in range(start, stop)]
+        self._link_candidates(vals_list)
+        return vals_list
+
+    def _run_scenario(self, applicant_count, template_count):
+        metrics = {}
+        Template = self.env['recruitment.custom.field']
+        Applicant = self.env['hr.applicant']
+
+        with self._measure(metrics, 'template_create', template_count):
+            templates = Template.create(self._template_vals(template_count))
+        self.assertTrue(all(template._column_name() in Applicant._fields for template in templates))
+
+        with self._measure(metrics, 'template_write', template_count):
+            for template in templates:
+                template.name = f'{template.name} (renamed)'
+
+        with self._measure(metrics, 'template_write_batch', template_count):
+            templates.write({'anchor_field': 'job_id'})
+
+        batches = [
+            self._applicant_vals(templates, start, min(start + BATCH_SIZE, applicant_count))
+            for start in range(0, applicant_count, BATCH_SIZE)
+        ]
+        applicants = Applicant.browse()
+        with self._measure(metrics, 'applicant_create', applicant_count):
+            for vals_list in batches:
+                applicants |= Applicant.create(vals_list)
+                self.env.invalidate_all()
+
+        written = templates.filtered('validation_operator')[:1] or templates[:1]
+        column = written._column_name()
+        with self._measure(metrics, 'applicant_write', applicant_count):
+            for index, start in enumerate(range(0, applicant_count, BATCH_SIZE)):
+                batch = applicants[start:start + BATCH_SIZE]
+                batch.write({column: self._custom_value(written.field_type, index + 1)})
+                self.env.invalidate_all()
+
+        with self._measure(metrics, 'apply_dynamic_rules', applicant_count):
+            for start in range(0, applicant_count, BATCH_SIZE):
+                applicants[start:start + BATCH_SIZE]._apply_dynamic_rules()
+                self.env.invalidate_all()
+
+        with self._measure(metrics, 'reapply_dynamic_rules_sql', applicant_count):
+            Applicant._reapply_dynamic_rules_sql()
+
+        for view_type in ('list', 'form'):
+            with self._measure(metrics, f'get_view_{view_type}_uncached', VIEW_REPEAT):
+                for __ in range(VIEW_REPEAT):
+                    Applicant._get_view(view_type=view_type)
+            Applicant.get_view(view_type=view_type)
+            with self._measure(metrics, f'get_view_{view_type}_cached', VIEW_REPEAT):
+                for __ in range(VIEW_REPEAT):
+                    Applicant.get_view(view_type=view_type)
+
+        with self._measure(metrics, 'fields_get', VIEW_REPEAT):
+            for __ in range(VIEW_REPEAT):
+                Applicant.fields_get(attributes=['string', 'type'])
+
+        # leave the registry as found for the next scenario
+        self.env.cr.execute(SQL("DELETE FROM hr_applicant WHERE id = ANY(%s)", applicants.ids))
+        self.env.invalidate_all()
+        with self._measure(metrics, 'template_unlink', template_count):
+            templates.unlink()
+
+        self.results.append({
+            'applicants': applicant_count,
+            'templates': template_count,
+            'metrics': metrics,
+        })
+
+    def test_benchmark(self):
+        for applicant_count in _volumes('PEEPL_HR_BENCH_APPLICANTS', '1000'):
+            for template_count in _volumes('PEEPL_HR_BENCH_TEMPLATES', '5'):
+                with self.subTest(applicants=applicant_count, templates=template_count):
+                    self._run_scenario(applicant_count, template_count)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import RecruitmentCase
+
+# (field type, operator, value, indexes of the matching applicants); the
+# applicants hold no value, then integers 0, 5, 60, texts 'pass', 'Pass',
+# 'fail', booleans False, True, True and partners alpha, beta, none
+SEARCHES = [
+    ('integer', '=', 5, [2]),
+    ('integer', '!=', 5, [0, 1, 3]),
+    ('integer', '>', 4, [2, 3]),
+    ('integer', '<=', 0, [1]),
+    ('integer', '=', False, [0]),
+    ('integer', '!=', False, [1, 2, 3]),
+    ('integer', 'in', [0, 60], [1, 3]),
+    ('integer', 'in', [5, None], [0, 2]),
+    ('integer', 'not in', [5], [0, 1, 3]),
+    ('integer', 'not in', [5, False], [1, 3]),
+    ('char', '=', 'pass', [1]),
+    ('char', '!=', 'pass', [0, 2, 3]),
+    ('char', 'like', 'pas', [1]),
+    ('char', 'ilike', 'pas', [1, 2]),
+    ('char', 'not ilike', 'pas', [0, 3]),
+    ('char', '=ilike', 'PASS', [1, 2]),
+    ('char', '=', False, [0]),
+    ('char', 'in', ['pass', 'fail'], [1, 3]),
+    ('boolean', '=', True, [2, 3]),
+    ('boolean', '=', False, [0, 1]),
+    ('boolean', '!=', False, [2, 3]),
+    ('boolean', '!=', True, [0, 1]),
+    ('many2one', '=', False, [0, 3]),
+    ('many2one', '!=', False, [1, 2]),
+    ('many2one', 'ilike', 'json partner alpha', [1]),
+    ('many2one', 'not ilike', 'json partner alpha', [0, 2, 3]),
+    ('many2one', '=', 'JSON Partner Beta', [2]),
+    ('many2one', '!=', 'JSON Partner Beta', [0, 1, 3]),
+]
+
+
+@tagged('post_install', '-at_install')
+class TestCustomFieldJson(RecruitmentCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, mail_create_nolog=True))
+        cls.job = cls.env['hr.job'].create({'name': 'JSON Test Position'})
+        cls.partners = cls.env['res.partner'].create([{'name': 'JSON Partner Alpha'}, {'name': 'JSON Partner Beta'}])
+        cls.templates = cls.env['recruitment.custom.field'].create([{
+            'name': f'JSON Test {field_type}',
+            'field_type': field_type,
+            'storage': 'json',
+            'relation_model': 'res.partner' if field_type == 'many2one' else False,
+        } for field_type in ('integer', 'char', 'boolean', 'many2one')])
+        cls.fnames = {template.field_type: template._column_name() for template in cls.templates}
+
+        values = [
+            {},
+            {'integer': 0, 'char': 'pass', 'boolean': False, 'many2one': cls.partners[0].id},
+            {'integer': 5, 'char': 'Pass', 'boolean': True, 'many2one': cls.partners[1].id},
+            {'integer': 60, 'char': 'fail', 'boolean': True},
+        ]
+        vals_list = [{
+            'partner_name': f'JSON Test Applicant {index}',
+            'email_from': f'json{index}@test.example.com',
+            'job_id': cls.job.id,
+            **{cls.fnames[field_type]: value for field_type, value in applicant_values.items()},
+        } for index, applicant_values in enumerate(values)]
+        cls.applicants = cls.env['hr.applicant'].create(cls._link_candidates(vals_list))
+
+    def test_search(self):
+        """Searches on JSON fields match the values stored in custom_values"""
+        Applicant = self.env['hr.applicant']
+        for field_type, operator, value, indexes in SEARCHES:
+            with self.subTest(field_type=field_type, operator=operator, value=value):
+                applicants = Applicant.search([
+                    ('id', 'in', self.applicants.ids),
+                    (self.fnames[field_type], operator, value),
+                ])
+                self.assertEqual(applicants, self.applicants.browse(self.applicants.ids[index] for index in indexes))
+
+    def test_compute_inverse(self):
+        """Values written on JSON fields are read back from custom_values"""
+        applicant = self.applicants[0]
+        fnames = self.fnames
+        applicant.write({
+            fnames['integer']: 7,
+            fnames['char']: 'strong',
+            fnames['boolean']: True,
+            fnames['many2one']: self.partners[1].id,
+        })
+        self.env.invalidate_all()
+        self.assertEqual(applicant.custom_values, {
+            fnames['integer']: 7,
+            fnames['char']: 'strong',
+            fnames['boolean']: True,
+            fnames['many2one']: self.partners[1].id,
+        })
+        self.assertEqual(applicant[fnames['integer']], 7)
+        self.assertEqual(applicant[fnames['char']], 'strong')
+        self.assertTrue(applicant[fnames['boolean']])
+        self.assertEqual(applicant[fnames['many2one']], self.partners[1])
+
+        # emptied values are removed, the others are kept
+        applicant.write({fnames['char']: False, fnames['many2one']: False})
+        self.env.invalidate_all()
+        self.assertEqual(applicant.custom_values, {fnames['integer']: 7, fnames['boolean']: True})
+
+        # values of another type and deleted records read as empty
+        partner = self.env['res.partner'].create({'name': 'JSON Partner Deleted'})
+        applicant.custom_values = {fnames['integer']: 'abc', fnames['many2one']: partner.id}
+        partner.unlink()
+        self.env.invalidate_all()
+        self.assertEqual(applicant[fnames['integer']], 0)
+        self.assertFalse(applicant[fnames['many2one']])
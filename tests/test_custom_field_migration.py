@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime
+
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+from ..models.recruitment_custom_field import COLUMN_TYPES
+from .common import RecruitmentCase
+
+# (current type, new type, value, converted value)
+CASTS = [
+    ('char', 'integer', '42', 42),
+    ('char', 'integer', ' -7 ', -7),
+    ('char', 'integer', '4.2', None),
+    ('char', 'integer', '2147483648', None),
+    ('char', 'integer', 'abc', None),
+    ('char', 'float', '1.5', 1.5),
+    ('char', 'float', ' .5 ', 0.5),
+    ('char', 'float', '1.5e2', 150.0),
+    ('char', 'float', '1e999', None),
+    ('char', 'float', '1e-999', None),
+    ('char', 'float', 'nan', None),
+    ('char', 'boolean', 'Yes', True),
+    ('char', 'boolean', '0', False),
+    ('char', 'boolean', 'maybe', None),
+    ('char', 'date', '2024-02-29', date(2024, 2, 29)),
+    ('char', 'date', '2024-02-30', None),
+    ('char', 'datetime', '2024-01-01 10:00:00', datetime(2024, 1, 1, 10)),
+    ('char', 'selection', ' B ', 'B'),
+    ('char', 'selection', 'C', None),
+    ('char', 'many2one', '1', None),
+    ('integer', 'char', 42, '42'),
+    ('integer', 'float', 42, 42.0),
+    ('integer', 'boolean', 0, False),
+    ('integer', 'boolean', 5, True),
+    ('float', 'integer', 2.6, 3),
+    ('float', 'integer', 1e12, None),
+    ('float', 'char', 2.5, '2.5'),
+    ('boolean', 'integer', True, 1),
+    ('boolean', 'char', False, 'False'),
+    ('boolean', 'selection', True, None),
+    ('date', 'char', date(2024, 1, 1), '2024-01-01'),
+    ('date', 'datetime', date(2024, 1, 1), datetime(2024, 1, 1)),
+    ('datetime', 'date', datetime(2024, 1, 1, 10), date(2024, 1, 1)),
+    ('datetime', 'char', datetime(2024, 1, 1, 10), '2024-01-01 10:00:00'),
+]
+
+
+@tagged('post_install', '-at_install')
+class TestCustomFieldMigration(RecruitmentCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, mail_create_nolog=True))
+        cls.job = cls.env['hr.job'].create({'name': 'Migration Test Position'})
+        cls.template = cls.env['recruitment.custom.field'].create({
+            'name': 'Migration Test Score',
+            'field_type': 'char',
+        })
+        cls.column = cls.template._column_name()
+
+    def test_cast_matrix(self):
+        """Values are converted to the new type, or become NULL"""
+        Template = self.env['recruitment.custom.field']
+        Template._create_try_cast_function()
+        for old_type, new_type, value, expected in CASTS:
+            with self.subTest(old_type=old_type, new_type=new_type, value=value):
+                template = Template.new({
+                    'field_type': old_type,
+                    'migration_field_type': new_type,
+                    'selection_values': 'A\nB',
+                })
+                cast = template._get_migration_cast(SQL("%s::%s", value, SQL(COLUMN_TYPES[old_type])))
+                self.env.cr.execute(SQL("SELECT %s", cast))
+                self.assertEqual(self.env.cr.fetchone()[0], expected)
+
+    def test_migration_steps(self):
+        """The values are migrated step by step, edits made meanwhile included"""
+        vals_list = [{
+            'partner_name': f'Migration Test Applicant {index}',
+            'email_from': f'migration{index}@test.example.com',
+            'job_id': self.job.id,
+            self.column: value,
+        } for index, value in enumerate(['12', ' 7 ', 'x', False])]
+        self._link_candidates(vals_list)
+        applicants = self.env['hr.applicant'].create(vals_list)
+        names = self.template._migration_names()
+
+        self.template.field_type = 'integer'
+        self.assertEqual(self.template.field_type, 'char')
+        self.assertEqual(self.template.migration_state, 'pending')
+
+        self.template._migrate_pending(2)
+        self.assertEqual(self.template.migration_state, 'backfill')
+        # mirrored by the trigger
+        applicants[2].write({self.column: '13'})
+        self.env.flush_all()
+
+        steps = 0
+        while self.template.migration_state == 'backfill':
+            self.template._migrate_backfill(2)
+            steps += 1
+        self.assertGreater(steps, 1)
+        self.assertEqual(self.template.migration_state, 'index')
+
+        self.template._migrate_index(2)
+        self.env.cr.execute(SQL("SELECT 1 FROM pg_indexes WHERE indexname = %s", names['new_index']))
+        self.assertTrue(self.env.cr.fetchone())
+        self.assertEqual(self.template.migration_state, 'swap')
+
+        self.template._migrate_swap(2)
+        self.assertEqual(self.template.field_type, 'integer')
+        self.assertFalse(self.template.migration_state)
+        self.env.cr.execute(SQL(
+            "SELECT %s, %s FROM hr_applicant WHERE id = ANY(%s) ORDER BY id",
+            SQL.identifier(names['column']), SQL.identifier(names['prev_column']), applicants.ids,
+        ))
+        self.assertEqual(self.env.cr.fetchall(), [(12, '12'), (7, ' 7 '), (13, '13'), (None, None)])
+        self.env.cr.execute(SQL(
+            "SELECT data_type FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+            names['table'], names['column'],
+        ))
+        self.assertEqual(self.env.cr.fetchone()[0], 'integer')
+        self.assertEqual(self.template._find_template_column().ttype, 'integer')
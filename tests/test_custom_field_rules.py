@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+from odoo.exceptions import AccessError
+from odoo.tests import new_test_user, tagged
+from odoo.tools import SQL
+
+from ..models.recruitment_custom_field import CompiledRule
+from .common import RecruitmentCase
+
+SELECTION_OPTIONS = ['A', 'B', 'C', 'D']
+# values given to the applicants, per field type
+FIELD_VALUES = {
+    'integer': [False, 0, 5, 30, 60, 61, -3],
+    'float': [False, 0.0, 2.5, 7.5, 10.1, -1.5],
+    'char': [False, 'pass', 'strong', 'Pass', 'fail', 'é'],
+    'selection': [False, 'A', 'B', 'C', 'D'],
+    'boolean': [False, True],
+    'date': [False, date(2024, 1, 1)],
+}
+OPERATORS = ['=', '!=', '>', '>=', '<', '<=', 'in', 'not in', 'between']
+# every threshold is tried with every operator on every field type
+THRESHOLDS = ['60', '5,60', '2.5,7.5', 'pass', 'pass,strong', 'B', 'A,C', 'B,D', 'True', 'abc', False]
+
+
+@tagged('post_install', '-at_install')
+class TestCustomFieldRules(RecruitmentCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(
+            cls.env.context, tracking_disable=True, mail_create_nolog=True, defer_dynamic_rules=False,
+        ))
+        cls.recommended = cls.env.ref('peepl_hr_custom.status_recommended')
+        cls.offer_made = cls.env.ref('peepl_hr_custom.status_offer_made')
+        cls.do_not_pursue = cls.env.ref('peepl_hr_custom.status_do_not_pursue')
+        cls.job = cls.env['hr.job'].create({'name': 'Rule Test Position'})
+
+        specs = [(field_type, 'column') for field_type in FIELD_VALUES] + [('char', 'json'), ('integer', 'json')]
+        cls.templates = cls.env['recruitment.custom.field'].create([{
+            'name': f'Rule Test {field_type} {storage}',
+            'field_type': field_type,
+            'storage': storage,
+            'selection_values': '\n'.join(SELECTION_OPTIONS) if field_type == 'selection' else False,
+        } for field_type, storage in specs])
+
+        count = max(len(values) for values in FIELD_VALUES.values())
+        vals_list = [{
+            'partner_name': f'Rule Test Applicant {index}',
+            'email_from': f'rule{index}@test.example.com',
+            'job_id': cls.job.id,
+            **{
+                template._column_name(): FIELD_VALUES[template.field_type][index % len(FIELD_VALUES[template.field_type])]
+                for template in cls.templates
+            },
+        } for index in range(count)]
+        cls._link_candidates(vals_list)
+        cls.applicants = cls.env['hr.applicant'].create(vals_list)
+
+        # a dropdown value that is not among the options
+        dropdown = cls.templates.filtered(lambda template: template.field_type == 'selection')
+        cls.env.flush_all()
+        cls.env.cr.execute(SQL(
+            "UPDATE hr_applicant SET %s = 'Z' WHERE id = %s",
+            SQL.identifier(dropdown._column_name()), cls.applicants[-1].id,
+        ))
+        cls.env.invalidate_all()
+        dropdown._reindex_ordinals()
+
+    def _sql_decisions(self, rule, ordinal=None):
+        Applicant = self.env['hr.applicant']
+        expression = rule.to_sql(Applicant._custom_value_sql(rule.column), ordinal)
+        if expression is None:
+            return dict.fromkeys(self.applicants.ids, False)
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            "SELECT id, %s FROM hr_applicant WHERE id = ANY(%s)", expression, self.applicants.ids,
+        ))
+        return {applicant_id: decision or False for applicant_id, decision in self.env.cr.fetchall()}
+
+    def test_sql_matches_orm(self):
+        """to_sql yields the decisions of decide, on the value and on the
+        ordinal column of dropdowns"""
+        Applicant = self.env['hr.applicant']
+        for template in self.templates:
+            for op in OPERATORS:
+                for threshold in THRESHOLDS:
+                    rule = CompiledRule.from_template(template, {
+                        'validation_operator': op,
+                        'validation_value': threshold,
+                        'target_decision': self.recommended,
+                        'default_decision': self.do_not_pursue,
+                    })
+                    expected = {applicant.id: rule.decide(applicant[rule.column]) for applicant in self.applicants}
+                    ordinals = [None]
+                    if Applicant._custom_ordinal_sql(rule.column) is not None:
+                        ordinals.append(Applicant._custom_ordinal_sql(rule.column))
+                    for ordinal in ordinals:
+                        with self.subTest(field=template.name, operator=op, threshold=threshold, ordinal=bool(ordinal)):
+                            self.assertEqual(self._sql_decisions(rule, ordinal), expected)
+
+    def test_reapply_sql_matches_orm(self):
+        """Re-applying the rules in SQL sets the decisions the ORM evaluation sets"""
+        by_type = {template.field_type: template for template in self.templates if template.storage == 'column'}
+        json_char = self.templates.filtered(lambda template: template.storage == 'json' and template.field_type == 'char')
+        rules = [
+            (by_type['integer'], '>=', '60', self.recommended, self.do_not_pursue),
+            (by_type['selection'], '>=', 'C', self.offer_made, False),
+            (by_type['float'], 'between', '2.5,7.5', self.recommended, False),
+            (json_char, 'in', 'pass,strong', self.offer_made, False),
+        ]
+        for template, op, threshold, target, default in rules:
+            template.write({
+                'validation_active': True,
+                'validation_operator': op,
+                'validation_value': threshold,
+                'target_decision': target.id,
+                'default_decision': default and default.id,
+            })
+
+        def reset():
+            self.env.flush_all()
+            self.env.cr.execute(SQL("UPDATE hr_applicant SET hire_decision = NULL WHERE id = ANY(%s)", self.applicants.ids))
+            self.env.invalidate_all()
+
+        reset()
+        self.applicants._apply_dynamic_rules()
+        expected = {applicant.id: applicant.hire_decision for applicant in self.applicants}
+        self.assertTrue(any(expected.values()))
+        reset()
+        self.env['hr.applicant']._reapply_dynamic_rules_sql()
+        self.assertEqual({applicant.id: applicant.hire_decision for applicant in self.applicants}, expected)
+
+    def test_reapply_requires_write_access(self):
+        user = new_test_user(self.env, login='rule_test_employee', groups='base.group_user')
+        with self.assertRaises(AccessError):
+            self.templates[:1].with_user(user).action_reapply_rules()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+from .common import RecruitmentCase
+
+
+@tagged('post_install', '-at_install')
+class TestFunnelSnapshot(RecruitmentCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(
+            cls.env.context, tracking_disable=True, mail_create_nolog=True, defer_dynamic_rules=False,
+        ))
+        cls.job = cls.env['hr.job'].create({'name': 'Snapshot Test Position'})
+        cls.template = cls.env['recruitment.custom.field'].create({
+            'name': 'Snapshot Test Score',
+            'field_type': 'integer',
+            'validation_active': True,
+            'validation_operator': '>=',
+            'validation_value': '60',
+            'target_decision': cls.env.ref('peepl_hr_custom.status_recommended').id,
+            'default_decision': cls.env.ref('peepl_hr_custom.status_do_not_pursue').id,
+        })
+        cls.column = cls.template._column_name()
+
+    def setUp(self):
+        super().setUp()
+        self.env['recruitment.funnel.snapshot']._rebuild()
+
+    def _create_applicants(self, scores):
+        vals_list = [{
+            'partner_name': f'Snapshot Test Applicant {index}',
+            'email_from': f'snapshot{index}@test.example.com',
+            'job_id': self.job.id,
+            'hire_decision': 'on_progress',
+            'last_test': date(2024, 3, 15),
+            self.column: score,
+        } for index, score in enumerate(scores)]
+        self._link_candidates(vals_list)
+        return self.env['hr.applicant'].create(vals_list)
+
+    def _snapshot(self):
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            """
+            SELECT company_id, job_id, stage_id, hire_decision, recruitment_phase, month, applicant_count
+              FROM recruitment_funnel_snapshot
+             WHERE applicant_count <> 0
+            """
+        ))
+        return set(self.env.cr.fetchall())
+
+    def assertSnapshotRebuilt(self):
+        """The incrementally maintained snapshot is the one a rebuild gives"""
+        snapshot = self._snapshot()
+        self.env['recruitment.funnel.snapshot']._rebuild()
+        self.assertEqual(snapshot, self._snapshot())
+
+    def test_create_with_rule(self):
+        applicants = self._create_applicants([70, 10, 60])
+        self.assertEqual(applicants.mapped('hire_decision'), ['recommended', 'do_not_pursue', 'recommended'])
+        self.assertSnapshotRebuilt()
+
+    def test_write_with_rule(self):
+        applicants = self._create_applicants([70, 10])
+        self.env['recruitment.funnel.snapshot']._rebuild()
+        # a funnel field and a rule column at once, then a rule column alone
+        applicants[0].write({self.column: 10, 'recruitment_phase': 'ai_interview'})
+        applicants[1].write({self.column: 90})
+        self.assertEqual(applicants.mapped('hire_decision'), ['do_not_pursue', 'recommended'])
+        self.assertSnapshotRebuilt()
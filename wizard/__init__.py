@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import recruitment_applicant_import
+from . import recruitment_rule_simulation
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+
+from odoo import fields, models
+from odoo.exceptions import UserError
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+class RecruitmentApplicantImport(models.TransientModel):
+    """Bulk import of applicants with their custom field values"""
+    _name = 'recruitment.applicant.import'
+    _description = 'Applicant Bulk Import'
+
+    file = fields.Binary('File', required=True, attachment=False,
+                         help='CSV or XLSX file, the first row holding field names or labels')
+    filename = fields.Char('File Name')
+    chunk_size = fields.Integer('Batch Size', default=1000, required=True)
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    created_count = fields.Integer('Imported', readonly=True)
+    error_count = fields.Integer('Errors', readonly=True)
+    duration = fields.Float('Duration (s)', readonly=True, digits=(16, 1))
+    rows_per_second = fields.Float('Rows per Second', readonly=True, digits=(16, 0))
+    error_log = fields.Text('Error Details', readonly=True)
+
+    def _read_rows(self):
+        """Yield the rows of the file as lists of values"""
+        content = io.BytesIO(base64.b64decode(self.file))
+        if (self.filename or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise UserError('The openpyxl library is required to import XLSX files.')
+            book = openpyxl.load_workbook(content, read_only=True, data_only=True)
+            try:
+                yield from book.active.iter_rows(values_only=True)
+            finally:
+                book.close()
+        else:
+            yield from csv.reader(io.TextIOWrapper(content, encoding='utf-8-sig', newline=''))
+
+    def action_import(self):
+        self.ensure_one()
+        if self.chunk_size < 1:
+            raise UserError('The batch size must be positive.')
+        result = self.env['hr.applicant']._import_applicants(self._read_rows(), chunk_size=self.chunk_size)
+        self.write({
+            'state': 'done',
+            'created_count': result['created'],
+            'error_count': len(result['errors']),
+            'duration': result['duration'],
+            'rows_per_second': result['created'] / result['duration'] if result['duration'] else 0,
+            'error_log': '\n'.join(f'Row {row}: {message}' for row, message in result['errors']),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
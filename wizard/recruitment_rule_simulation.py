@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+import time
+
+from odoo import Command, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+from ..models.recruitment_custom_field import COMPARE_OPERATORS, NUMERIC_TYPES, STRING_TYPES, CompiledRule
+from ..models.recruitment_perf_stat import profiled
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# changed applicants listed after a simulation
+SAMPLE_SIZE = 20
+
+
+def _value_sql(rule, expression):
+    """Return the SQL fetching the value ``rule`` reads, in the form
+    ``_decide_array`` expects"""
+    if rule.field_type in NUMERIC_TYPES:
+        return SQL("%s::float8", expression)
+    if rule.field_type in STRING_TYPES:
+        return SQL("COALESCE(%s::text, '')", expression)
+    if rule.field_type == 'boolean':
+        return SQL("COALESCE(%s, FALSE)", expression)
+    # other rules only depend on whether a value is set
+    return SQL("(%s IS NOT NULL)", expression)
+
+
+def _decide_array(rule, values):
+    """Vectorized ``CompiledRule.decide`` over the fetched ``values``, with
+    '' where the rule yields no decision"""
+    kind, op, operand = rule.kind, rule.operator, rule.operand
+    target, default = rule.target or '', rule.default or ''
+    if kind == 'none':
+        return np.full(len(values), default, dtype=object)
+
+    if rule.field_type in NUMERIC_TYPES:
+        values = np.array(values, dtype=float)
+        truthy = ~np.isnan(values) & (values != 0)
+    elif rule.field_type in STRING_TYPES:
+        values = np.array(values, dtype=object)
+        truthy = values != ''
+    else:
+        values = truthy = np.array(values, dtype=bool)
+
+    with np.errstate(invalid='ignore'):
+        if kind == 'const':
+            matched = np.full(len(values), bool(operand))
+        elif kind == 'ordinal':
+            # position of each value in the selection, -1 when not an option
+            options, inverse = np.unique(values, return_inverse=True)
+            positions = np.array([rule.options.get(option, -1) for option in options], dtype=int)[inverse]
+            if op == 'between':
+                matched = (positions >= operand[0]) & (positions <= operand[1])
+            else:
+                matched = COMPARE_OPERATORS[op](positions, operand)
+            matched &= positions >= 0
+        elif op == 'in':
+            matched = np.isin(values, list(operand))
+        elif op == 'not in':
+            matched = ~np.isin(values, list(operand))
+        elif op == 'between':
+            matched = (values >= operand[0]) & (values <= operand[1])
+        else:
+            matched = COMPARE_OPERATORS[op](values, operand)
+    return np.where(truthy & matched, target, default).astype(object)
+
+
+class RecruitmentRuleSimulation(models.TransientModel):
+    """What-if evaluation of a draft auto-decision rule over all applicants"""
+    _name = 'recruitment.rule.simulation'
+    _description = 'Auto-Decision Rule Simulation'
+
+    template_id = fields.Many2one('recruitment.custom.field', 'Custom Field', required=True, readonly=True, ondelete='cascade')
+    field_type = fields.Selection(related='template_id.field_type')
+    selection_values = fields.Text(related='template_id.selection_values')
+    validation_operator = fields.Selection(
+        selection=lambda self: self.env['recruitment.custom.field']._fields['validation_operator'].selection,
+        string='Operator')
+    validation_value = fields.Char('Threshold Value')
+    target_decision = fields.Many2one('recruitment.status.config', 'Set Decision To', domain=[('active', '=', True)])
+    default_decision = fields.Many2one('recruitment.status.config', 'Default Decision', domain=[('active', '=', True)])
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    applicant_count = fields.Integer('Applicants', readonly=True)
+    changed_count = fields.Integer('Decisions Changed', readonly=True)
+    duration_ms = fields.Float('Duration (ms)', readonly=True, digits=(16, 0))
+    line_ids = fields.One2many('recruitment.rule.simulation.line', 'simulation_id', 'Distribution', readonly=True)
+    sample_ids = fields.One2many('recruitment.rule.simulation.sample', 'simulation_id', 'Changed Applicants', readonly=True)
+
+    def _get_draft(self):
+        return {
+            'validation_operator': self.validation_operator,
+            'validation_value': self.validation_value,
+            'target_decision': self.target_decision,
+            'default_decision': self.default_decision,
+        }
+
+    def _get_decision_sql(self):
+        """Return the SQL of the decision of every applicant around the
+        draft rule: ``(higher, lower)``, the decision of the rules of
+        later templates, which take precedence over it, and of the earlier
+        ones falling back to the current decision, which only apply where
+        it yields none"""
+        Template = self.env['recruitment.custom.field']
+        Applicant = self.env['hr.applicant']
+        template = self.template_id
+        others = [
+            other for other in Template._get_compiled_rules()
+            if other.template_id != template.id and other.column in Applicant._fields
+        ]
+        ranks = {record.id: (record.sequence, record.id) for record in Template.sudo().browse([other.template_id for other in others])}
+
+        def coalesce(rules, *fallback):
+            expressions = [
+                expression for other in reversed(rules)
+                if (expression := other.to_sql(
+                    Applicant._custom_value_sql(other.column), Applicant._custom_ordinal_sql(other.column),
+                )) is not None
+            ]
+            return SQL("COALESCE(%s)", SQL(", ").join([*expressions, *fallback]))
+
+        rank = (template.sequence, template.id)
+        return (
+            coalesce([other for other in others if ranks[other.template_id] > rank], SQL("''")),
+            coalesce([other for other in others if ranks[other.template_id] < rank],
+                     SQL.identifier('hire_decision'), SQL("''")),
+        )
+
+    def _get_decision_labels(self, codes):
+        labels = dict(self.env['hr.applicant']._fields['hire_decision']._description_selection(self.env))
+        statuses = self.env['recruitment.status.config'].get_by_codes(codes)
+        return {code: statuses[code].name if code in statuses else labels.get(code, code) for code in codes}
+
+    @profiled
+    def _simulate(self):
+        """Evaluate the draft rule over all applicants, the way re-applying
+        the rules would after saving it, and store the before/after decision
+        distribution with a sample of the changed applicants"""
+        self.ensure_one()
+        if np is None:
+            raise UserError('The numpy library is required to simulate rules.')
+        Applicant = self.env['hr.applicant'].sudo()
+        column = self.template_id._column_name()
+        if column not in Applicant._fields:
+            raise UserError('The field of this template is not available yet, please try again in a moment.')
+        rule = CompiledRule.from_template(self.template_id, self._get_draft())
+        higher, lower = self._get_decision_sql()
+
+        start = time.perf_counter()
+        Applicant.flush_model()
+        # the whole population in one query: the other rules are evaluated in
+        # SQL, the draft one on arrays
+        self.env.cr.execute(SQL(
+            "SELECT id, COALESCE(hire_decision, ''), %s, %s, %s FROM %s ORDER BY id",
+            _value_sql(rule, Applicant._custom_value_sql(column)), higher, lower, SQL.identifier(Applicant._table),
+        ))
+        rows = self.env.cr.fetchall()
+        ids, before, values, higher, lower = list(zip(*rows)) or [()] * 5
+        before, higher, lower = (np.array(codes, dtype=object) for codes in (before, higher, lower))
+        draft = _decide_array(rule, values)
+        after = np.where(higher != '', higher, np.where(draft != '', draft, lower))
+        changed = np.flatnonzero(before != after)
+        duration = time.perf_counter() - start
+
+        counts_before = dict(zip(*np.unique(before, return_counts=True)))
+        counts_after = dict(zip(*np.unique(after, return_counts=True)))
+        codes = sorted(counts_before.keys() | counts_after.keys())
+        labels = self._get_decision_labels([code for code in codes if code])
+        self.write({
+            'state': 'done',
+            'applicant_count': len(rows),
+            'changed_count': len(changed),
+            'duration_ms': duration * 1000,
+            'line_ids': [Command.clear()] + [
+                Command.create({
+                    'decision': code,
+                    'name': labels.get(code) or 'No Decision',
+                    'before_count': int(counts_before.get(code, 0)),
+                    'after_count': int(counts_after.get(code, 0)),
+                })
+                for code in codes
+            ],
+            'sample_ids': [Command.clear()] + [
+                Command.create({
+                    'applicant_id': ids[index],
+                    'value': '' if values[index] is None else str(values[index]),
+                    'before_decision': labels.get(before[index]) or 'No Decision',
+                    'after_decision': labels.get(after[index]) or 'No Decision',
+                })
+                for index in changed[:SAMPLE_SIZE]
+            ],
+        })
+
+    def action_simulate(self):
+        self._simulate()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_apply(self):
+        """Save the draft rule on the template"""
+        self.ensure_one()
+        self.template_id.write({
+            'validation_active': True,
+            'validation_operator': self.validation_operator,
+            'validation_value': self.validation_value,
+            'target_decision': self.target_decision.id,
+            'default_decision': self.default_decision.id,
+        })
+        return {'type': 'ir.actions.act_window_close'}
+
+
+class RecruitmentRuleSimulationLine(models.TransientModel):
+    _name = 'recruitment.rule.simulation.line'
+    _description = 'Auto-Decision Rule Simulation Distribution'
+    _order = 'after_count desc, id'
+
+    simulation_id = fields.Many2one('recruitment.rule.simulation', required=True, ondelete='cascade')
+    decision = fields.Char('Code')
+    name = fields.Char('Decision')
+    before_count = fields.Integer('Now')
+    after_count = fields.Integer('After')
+    difference = fields.Integer('Difference', compute='_compute_difference')
+
+    def _compute_difference(self):
+        for line in self:
+            line.difference = line.after_count - line.before_count
+
+
+class RecruitmentRuleSimulationSample(models.TransientModel):
+    _name = 'recruitment.rule.simulation.sample'
+    _description = 'Auto-Decision Rule Simulation Sample'
+
+    simulation_id = fields.Many2one('recruitment.rule.simulation', required=True, ondelete='cascade')
+    applicant_id = fields.Many2one('hr.applicant', 'Applicant', ondelete='cascade')
+    value = fields.Char('Value')
+    before_decision = fields.Char('Now')
+    after_decision = fields.Char('After')